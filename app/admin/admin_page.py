@@ -11,7 +11,8 @@ from admin.admin_dashboard import AdminDashboard
 
 from routine_details import RoutineDetails
 
-import admin.json_handler as json_handler
+import admin.storage as storage
+from admin.persistence import PersistenceWorker
 import admin.app_config as app_config
 
 #   User config files
@@ -241,6 +242,9 @@ class MyApp(AppHandler):
             self.sound_active = False
             self.sound.stop()
 
+        # Finish the writes still queued for the persistence worker.
+        PersistenceWorker().flush()
+
     def send_routine(self, rout_data: RoutineDetails):
         self._routine = rout_data
         load_pose_detection.load(rout_data.exercises)
@@ -264,27 +268,24 @@ class MyApp(AppHandler):
             return None
 
 class MyAppPreload:
-    # def load_db(self):
-    #     import sqlite3
-
-    #     connection = sqlite3.connect(app_config.db['user_profile'])
-    #     cursor = connection.cursor()
-
-    #     with open(app_config.db_cursor['user_profile'], 'r') as content:
-    #         user_sql = content.read()
-
-    #     cursor.executescript(user_sql)
+    def load_db(self):
+        if app_config.storage != 'sqlite':
+            return
+        import admin.sqlite_handler as sqlite_handler
 
-    #     connection.commit()
-    #     connection.close()
+        # Creates the tables if needed; the JSON files are imported
+        # once, into an empty database.
+        connection = sqlite_handler.connect()
+        if sqlite_handler.is_empty(connection):
+            sqlite_handler.import_json(connection)
 
     def __init__(self):
-        # self.load_db()
+        self.load_db()
 
         global exer_list_obj, rout_list_obj, user_list_obj, exer_popup
-        user_list_obj   = json_handler.JSONUser()
-        exer_list_obj   = json_handler.JSONExercise()
-        rout_list_obj   = json_handler.JSONRoutine()
+        user_list_obj   = storage.User()
+        exer_list_obj   = storage.Exercise()
+        rout_list_obj   = storage.Routine()
 
         exer_popup      = AdminPopup(title=app_config.popup["title"])
         exer_popup.set_body_text(app_config.popup["exercise"])
@@ -29,7 +29,8 @@ json                = {
     'content'       : 'exercises.json',
     'name'          : 'exercises_names.json',
     'routines'      : 'routines.json',
-    'user'          : 'users.json'
+    'user'          : 'users.json',
+    'rep_log'       : 'rep_log.jsonl'
 }
 # Lists:
 font_name = [
@@ -61,7 +62,14 @@ admin_page = {
 debug_start_page = 'main_screen'
 db = {
     'user_profile': 'db/user_profiles.db',
+    'scores': 'db/scores',
 }
+# 'json' uses the JSON files; 'sqlite' (opt-in) keeps users, exercises
+# and routines in db['user_profile'], imported once from the JSON files.
+storage = 'json'
+# Users whose score histories are kept loaded; the others only keep
+# their name until their history is used.
+user_cache = 16
 db_cursor = {
     'user_profile': 'db/cursor/user_profiles.sql'
 }
\ No newline at end of file
@@ -1,5 +1,11 @@
 import json
+import math
+import time
+from threading import Lock
 import admin.app_config as app_config
+from admin.persistence import PersistenceWorker, write_atomic
+from admin.score_store import ScoreStore
+from admin.user_cache import UserCache
 
 from exercise_details import ExerciseDetails
 from routine_details import RoutineDetails
@@ -12,6 +18,11 @@ class JSONExercise:
         return cls.instance
 
     def __init__(self):
+        # Loaded once: writes are deferred (see update), so reading
+        # the file again could see an older version.
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized       = True
         self.json_name_path     = app_config.json['name']
         self.json_path          = app_config.json['content']
         self.json_file          = open(self.json_path, 'r')
@@ -27,6 +38,9 @@ class JSONExercise:
             exer_dict           = self.json_list[i]
             self.json_list[i]   = ExerciseDetails.convert(exer_dict)
 
+        # json_list by name; add_exercise and remove_exercise keep
+        # both in step.
+        self._index             = {exercise.name: exercise for exercise in self.json_list}
         self.update()
 
     def extract_list(self) -> list[ExerciseDetails]:
@@ -42,7 +56,8 @@ class JSONExercise:
         return ret_list
     
     def update(self):
-        # Perform a write operation on exercises.json
+        # Snapshot the exercises here; exercises.json is written by
+        # the persistence worker.
         content_list        = []
         content_dict        = {
             'exercise'      : [],
@@ -69,23 +84,17 @@ class JSONExercise:
 
             content_list.append(exer_copy)
 
-        content             = json.dumps(content_list, indent = 4)
-        names               = json.dumps(content_dict, indent = 4)
-
-        with open(self.json_path, 'w') as json_file:
-            json_file.write(content)
-        with open(self.json_name_path, 'w') as json_file:
-            json_file.write(names)
+        json_path, json_name_path   = self.json_path, self.json_name_path
+        def write():
+            write_atomic(json_path, json.dumps(content_list, indent = 4))
+            write_atomic(json_name_path, json.dumps(content_dict, indent = 4))
+        PersistenceWorker().mark_dirty(json_path, write)
 
     def get_exercise(self, exer_name: str) -> ExerciseDetails:
-        for exercise_dict in self.json_list:
-            if exercise_dict.name == exer_name:
-                return exercise_dict
-            
-        return None
+        return self._index.get(exer_name)
 
     def remove_exercise(self, exer_name: str):
-        exer_dict   = self.get_exercise(exer_name)
+        exer_dict   = self._index.pop(exer_name, None)
         if exer_dict is None:
             return
             
@@ -102,11 +111,7 @@ class JSONExercise:
                      body_arr : list[str] = None,
                      angle_arr: list[float] = None):
         # Check if the exercise already exists in json_list.
-        new_exer_dict   = None
-        for exercise_dict in self.json_list:
-            if exercise_dict.name == exer_name:
-                new_exer_dict   = exercise_dict
-                break
+        new_exer_dict   = self._index.get(exer_name)
 
         if (new_exer_dict is not None):
             new_exer_dict.reps          = exer_reps
@@ -129,6 +134,7 @@ class JSONExercise:
                                       angle_arr)
         
         self.json_list.append(new_exer_dict)
+        self._index[exer_name]  = new_exer_dict
         self.update()
         return new_exer_dict
 
@@ -192,6 +198,14 @@ class JSONRoutine:
         return ret_list
     
 class JSONUser:
+    '''
+    Users from users.json, with their score histories in a ScoreStore
+    at app_config.db['scores'].
+
+    Startup only reads the usernames; a user's score history is read
+    from the store the first time it is used (see UserDetails), and at
+    most app_config.user_cache histories stay loaded at once.
+    '''
     def __new__(cls):
         if not hasattr(cls, 'instance'):
             cls.instance    = super(JSONUser, cls).__new__(cls)
@@ -202,31 +216,74 @@ class JSONUser:
             return
         self._initialized   = True
         self.json_path      = app_config.json['user']
-        self.json_file      = open(self.json_path, 'r')
-        if self.json_file is None:
-            self.json_list  = []
-        else:
-            self.json_list  = json.load(self.json_file)
-        self.json_file.close()
+        with open(self.json_path, 'r') as json_file:
+            users           = json.load(json_file)
+        self.store          = ScoreStore(app_config.db['scores'])
+
+        # Earlier versions kept the scores as text in users.json.
+        if any(len(user_dict['exercises']) > 0 for user_dict in users):
+            users           = self._migrate(users)
 
         # Parse User objects.
         self.user_list      = []
-        # Returns a singleton object, not to worry!
-        json_exer           = JSONExercise()
-        for user_dict in self.json_list:
-            user            = UserDetails(user_dict['username'])
-            user_exer_list  = user_dict['exercises']
+        # user_list by name.
+        self._index         = {}
+        for user_dict in users:
+            user                    = UserDetails(user_dict['username'], self._load_user)
             self.user_list.append(user)
+            self._index[user.username]  = user
 
-            exercise        = None
-            for user_dict in user_exer_list:
-                # Search for exercise object in user_exer_list
-                exercise    = json_exer.get_exercise(user_dict['name'])
-                if exercise is None:
-                    raise ValueError(f"\nCould not find the given exercise {user_dict['name']} in {app_config.json['content']}. Please add them directly or through the app.")
+        # Scores per user and exercise queued by update(), for the
+        # loaded users, and the (username, exercise name, time, score)
+        # rows the persistence worker has yet to store.
+        self._queued        = {}
+        self._events        = []
+        self._events_lock   = Lock()
+        self._cache         = UserCache(app_config.user_cache, self._evict)
+
+    def _migrate(self, users: list[dict]) -> list[dict]:
+        '''
+        Moves the scores in users.json into the store, and returns the
+        users left in users.json, without them.
+        '''
+        names       = [user_dict['username'] for user_dict in users]
+        for user_dict in users:
+            self.store.append(user_dict['username'], [
+                (exer_dict['name'], math.nan, float(score))
+                for exer_dict in user_dict['exercises']
+                for score in exer_dict['score']
+            ])
+
+        users       = [{'username': username, 'exercises': []} for username in names]
+        write_atomic(self.json_path, json.dumps(users, indent = 4))
+        print(f"FitQuest >> Moved the scores of {len(names)} users into {self.store.directory}")
+        return users
+
+    def _load_user(self, user: UserDetails):
+        with self._events_lock:
+            pending     = any(event[0] == user.username for event in self._events)
+        if pending:
+            # Its last scores are still on their way to the store.
+            PersistenceWorker().flush()
+
+        # Returns a singleton object, not to worry!
+        json_exer   = JSONExercise()
+        for exer_name, records in self.store.history(user.username).items():
+            exercise    = json_exer.get_exercise(exer_name)
+            if exercise is None:
+                print(f"FitQuest >> Skipping the scores of {user.username} for the unknown exercise {exer_name}")
+                continue
+            user.add_exercise(exercise, records['score'])
+
+        self._queued[user.username] = {exer_dict['name']: len(exer_dict['score'])
+                                       for exer_dict in user.exercises}
+        self._cache.touch(user)
+
+    def _evict(self, user: UserDetails):
+        # Its unsaved scores are queued before it is unloaded.
+        self._queue_events(self._user_events(user))
+        del self._queued[user.username]
 
-                user.add_exercise(exercise, user_dict['score'])
-        
     def extract_list(self) -> list[UserDetails]:
         ret_list    = []
         for user in self.user_list:
@@ -234,28 +291,97 @@ class JSONUser:
         return ret_list
     
     def get_user(self, query_username: str) -> UserDetails|None:
-        for user in self.user_list:
-            if user.username    == query_username:
-                return user
-        return None
+        user    = self._index.get(query_username)
+        if (user is not None) and user.loaded:
+            self._cache.touch(user)
+        return user
     
     def get_user_count(self) -> int:
         return len(self.user_list)
     
     def update(self):
-        content = []
-        for user in self.user_list:
-            user_dict   = {
-                'username'  : user.username,
-                'exercises' : [],
-            }
-            user_dict_exer  = user_dict['exercises']
-            for exercise in user.exercises:
-                user_dict_exer.append(exercise)
+        '''
+        Queues the scores added since the last update and returns; the
+        persistence worker appends them to the store.
+        '''
+        events  = []
+        for user in self._cache.users():
+            events.extend(self._user_events(user))
+        self._queue_events(events)
+
+    def _user_events(self, user: UserDetails) -> list[tuple[str, str, float, float]]:
+        events  = []
+        now     = round(time.time(), 3)
+        queued  = self._queued[user.username]
+        for exer_dict in user.exercises:
+            scores  = exer_dict['score']
+            for score in scores[queued.get(exer_dict['name'], 0):]:
+                events.append((user.username, exer_dict['name'], now, float(score)))
+            queued[exer_dict['name']]   = len(scores)
+        return events
+
+    def _queue_events(self, events: list[tuple[str, str, float, float]]):
+        if len(events) == 0:
+            return
+        with self._events_lock:
+            self._events.extend(events)
+        PersistenceWorker().mark_dirty(self.store.directory, self._write_scores)
 
-            content.append(user_dict)
+    def _write_scores(self):
+        with self._events_lock:
+            events  = list(self._events)
+
+        rows        = {}
+        for username, exer_name, timestamp, score in events:
+            rows.setdefault(username, []).append((exer_name, timestamp, score))
+        for username, user_rows in rows.items():
+            self.store.append(username, user_rows)
+
+        # Dropped only once stored, so _load_user waits for them.
+        with self._events_lock:
+            del self._events[:len(events)]
+
+class JSONRepLog:
+    '''
+    Per-rep history, one JSON line per finished set, appended to
+    app_config.json['rep_log']. The file is only touched once per
+    set, never per frame or per rep, and by the persistence worker.
+    '''
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance    = super(JSONRepLog, cls).__new__(cls)
+        return cls.instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized   = True
+        self.json_path      = app_config.json['rep_log']
+        self._entries       = []
+        self._entries_lock  = Lock()
+
+    def append(self, username: str, exercise: ExerciseDetails, rep_log,
+               timestamp: float = None):
+        '''
+        Appends the reps of one set (a RepLog) for the given user.
+        timestamp is the wall-clock time of the set, defaulting to now.
+        '''
+        if len(rep_log) == 0:
+            return
+
+        entry   = {
+            'username'  : username,
+            'exercise'  : exercise.name,
+            'time'      : round(time.time() if timestamp is None else timestamp, 3),
+            'reps'      : rep_log.to_dict(),
+        }
+        with self._entries_lock:
+            self._entries.append(entry)
+        PersistenceWorker().mark_dirty(self.json_path, self._write)
 
-        # Perform a write operation on users.json
-        users   = json.dumps(content, indent = 4)
-        with open(self.json_path, 'w') as json_file:
-            json_file.write(users)
\ No newline at end of file
+    def _write(self):
+        with self._entries_lock:
+            entries, self._entries  = self._entries, []
+        with open(self.json_path, 'a') as json_file:
+            for entry in entries:
+                json_file.write(json.dumps(entry, separators = (',', ':')) + '\n')
\ No newline at end of file
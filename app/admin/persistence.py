@@ -0,0 +1,81 @@
+import atexit
+import os
+from threading import Condition, Thread
+from typing import Callable
+
+class PersistenceWorker:
+    '''
+    Writes data files on a background thread, so the UI thread never
+    waits on serialization or disk I/O.
+
+    The UI thread calls mark_dirty(key, flush) and returns at once.
+    flush is a callable that does the actual write, usually a closure
+    over an immutable snapshot taken at that moment. Marks for the
+    same key coalesce: if a key is marked again before the worker
+    gets to it, only the latest flush runs. Different keys are
+    written in the order they were first marked.
+
+    Pending writes are flushed at interpreter exit, or with flush().
+    '''
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance    = super(PersistenceWorker, cls).__new__(cls)
+        return cls.instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized   = True
+        self._dirty         = {}
+        self._busy          = False
+        self._condition     = Condition()
+        self._thread        = Thread(
+            name            = "FitQuest-persistence",
+            target          = self._run,
+            daemon          = True
+        )
+        self._thread.start()
+        atexit.register(self.flush)
+
+    def mark_dirty(self, key: str, flush: Callable[[], None]):
+        with self._condition:
+            self._dirty[key]    = flush
+            self._condition.notify_all()
+
+    def flush(self, timeout: float = 10.0) -> bool:
+        '''
+        Waits until every pending write is done. Returns False on
+        timeout.
+        '''
+        with self._condition:
+            return self._condition.wait_for(lambda: (not self._dirty) and (not self._busy), timeout)
+
+    def _run(self):
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._dirty) > 0)
+                key         = next(iter(self._dirty))
+                flush       = self._dirty.pop(key)
+                self._busy  = True
+
+            try:
+                flush()
+            except Exception as exc:
+                print(f"FitQuest >> Could not save {key}: {exc!r}")
+            finally:
+                with self._condition:
+                    self._busy  = False
+                    self._condition.notify_all()
+
+def write_atomic(path: str, content: str):
+    '''
+    Replaces path with content, via a synced temporary file and
+    os.replace, so readers and crashes see the old or the new file,
+    never a partial one.
+    '''
+    temp_path   = path + '.tmp'
+    with open(temp_path, 'w') as temp_file:
+        temp_file.write(content)
+        temp_file.flush()
+        os.fsync(temp_file.fileno())
+    os.replace(temp_path, path)
\ No newline at end of file
@@ -0,0 +1,142 @@
+import json
+import os
+from threading import Lock
+from typing import Iterable
+
+import numpy as np
+from admin.persistence import write_atomic
+
+# One record per score, packed. time is the unix time the score was
+# saved at, NaN if not known.
+SCORE_DTYPE = np.dtype([('time', '<f8'), ('score', '<f4')])
+
+class ScoreStore:
+    '''
+    Binary score histories, one file per user and exercise, in
+    directory:
+
+        index.json          {"users": [...], "exercises": [...],
+                             "user_exercises": [[...], ...]};
+                            the id of a name is its position, and
+                            user_exercises lists each user's exercise
+                            ids in the order they were first saved.
+        <user id>/<exercise id>.scores
+                            the SCORE_DTYPE records of one exercise,
+                            in the order they were saved.
+
+    Files only grow: append() writes new records at the end of the
+    files, and index.json is only rewritten for a new user or a new
+    exercise of a user. history() hands out read-only memory-mapped
+    views of the files, so a reader only touches the pages it uses,
+    e.g. the last scores of a history. A record torn by a crash is
+    ignored, and cut off by the next append.
+    '''
+    def __init__(self, directory: str):
+        self.directory      = directory
+        self.users          = []
+        self.exercises      = []
+        self.user_exercises = []
+        self._index_path    = os.path.join(directory, 'index.json')
+        os.makedirs(directory, exist_ok = True)
+        if os.path.exists(self._index_path):
+            with open(self._index_path, 'r') as index_file:
+                index       = json.load(index_file)
+            self.users          = index['users']
+            self.exercises      = index['exercises']
+            self.user_exercises = index['user_exercises']
+
+        # Ids only get added, so history() looks them up without _lock.
+        self._user_ids      = {name: i for i, name in enumerate(self.users)}
+        self._exer_ids      = {name: i for i, name in enumerate(self.exercises)}
+        self._lock          = Lock()
+
+    def _path(self, user_id: int, exer_id: int) -> str:
+        return os.path.join(self.directory, str(user_id), f"{exer_id}.scores")
+
+    def read(self, username: str, exer_name: str) -> np.ndarray:
+        '''
+        Returns the user's records of one exercise, memory-mapped
+        read-only.
+        '''
+        user_id = self._user_ids.get(username)
+        exer_id = self._exer_ids.get(exer_name)
+        if (user_id is None) or (exer_id is None):
+            return np.zeros(0, SCORE_DTYPE)
+
+        path    = self._path(user_id, exer_id)
+        count   = os.path.getsize(path) // SCORE_DTYPE.itemsize if os.path.exists(path) else 0
+        if count == 0:
+            return np.zeros(0, SCORE_DTYPE)
+        return np.memmap(path, SCORE_DTYPE, mode = 'r', shape = (count,))
+
+    def history(self, username: str) -> dict[str, np.ndarray]:
+        '''
+        Returns the user's records per exercise name, in the order
+        the exercises were first saved. The records are views of the
+        memory-mapped files, not copies.
+        '''
+        user_id     = self._user_ids.get(username)
+        if user_id is None:
+            return {}
+
+        history     = {}
+        for exer_id in list(self.user_exercises[user_id]):
+            exer_name   = self.exercises[exer_id]
+            records     = self.read(username, exer_name)
+            if len(records) > 0:
+                history[exer_name]  = records
+        return history
+
+    def append(self, username: str, rows: Iterable[tuple[str, float, float]], sync: bool = True):
+        '''
+        Appends (exercise name, time, score) rows to the user's files,
+        synced to disk once per file for the whole batch unless sync
+        is False.
+        '''
+        rows    = list(rows)
+        if len(rows) == 0:
+            return
+
+        with self._lock:
+            added       = False
+            if username not in self._user_ids:
+                self._user_ids[username]    = len(self.users)
+                self.users.append(username)
+                self.user_exercises.append([])
+                added   = True
+            user_id     = self._user_ids[username]
+
+            grouped     = {}
+            for exer_name, time, score in rows:
+                if exer_name not in self._exer_ids:
+                    self._exer_ids[exer_name]   = len(self.exercises)
+                    self.exercises.append(exer_name)
+                exer_id = self._exer_ids[exer_name]
+                if exer_id not in grouped:
+                    grouped[exer_id]    = []
+                    if exer_id not in self.user_exercises[user_id]:
+                        self.user_exercises[user_id].append(exer_id)
+                        added   = True
+                grouped[exer_id].append((time, score))
+
+            # The index first: a crash before the records are written
+            # leaves an id without scores, not scores without an id.
+            if added:
+                write_atomic(self._index_path, json.dumps({
+                    'users'             : self.users,
+                    'exercises'         : self.exercises,
+                    'user_exercises'    : self.user_exercises,
+                }))
+
+            os.makedirs(os.path.join(self.directory, str(user_id)), exist_ok = True)
+            for exer_id, exer_rows in grouped.items():
+                records     = np.array(exer_rows, SCORE_DTYPE)
+                with open(self._path(user_id, exer_id), 'ab') as score_file:
+                    end     = score_file.seek(0, os.SEEK_END)
+                    if end % SCORE_DTYPE.itemsize != 0:
+                        print(f"FitQuest >> Dropping an incomplete score of {username} in {self.directory}")
+                        score_file.truncate(end - end % SCORE_DTYPE.itemsize)
+                    score_file.write(records.tobytes())
+                    if sync:
+                        score_file.flush()
+                        os.fsync(score_file.fileno())
\ No newline at end of file
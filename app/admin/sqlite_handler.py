@@ -0,0 +1,443 @@
+'''
+SQLite storage for exercises, routines and users, with the same
+interface as the classes in json_handler, in app_config.db['user_profile']
+with the schema in app_config.db_cursor['user_profile'].
+
+Saving a user's scores only inserts the scores added since the last
+save.
+
+The database is filled from the JSON files once, by load_db() when
+it is empty, or by hand:
+
+    python -m admin.sqlite_handler --import
+'''
+import argparse
+import json
+import os
+import sqlite3
+import sys
+from threading import Lock, RLock
+import admin.app_config as app_config
+from admin.persistence import PersistenceWorker
+from admin.score_store import ScoreStore
+from admin.user_cache import UserCache
+
+from exercise_details import ExerciseDetails
+from routine_details import RoutineDetails
+from user_details import UserDetails
+
+_connection     = None
+_lock           = RLock()
+
+# Prepared statements; sqlite3 caches them per connection.
+SQL_UPSERT_EXERCISE     = '''
+    INSERT INTO EXERCISE (NAME, REPS, SETS, DURATION, DESCRIPTION, IMAGE_PATH, BODYPARTS, ANGLES)
+    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ON CONFLICT (NAME) DO UPDATE SET
+        REPS = excluded.REPS, SETS = excluded.SETS, DURATION = excluded.DURATION,
+        DESCRIPTION = excluded.DESCRIPTION, IMAGE_PATH = excluded.IMAGE_PATH,
+        BODYPARTS = excluded.BODYPARTS, ANGLES = excluded.ANGLES, DELETED = 0'''
+SQL_DELETE_EXERCISE     = 'UPDATE EXERCISE SET DELETED = 1 WHERE NAME = ?'
+SQL_INSERT_REMOVED_EXER = '''
+    INSERT INTO EXERCISE (NAME, REPS, SETS, DURATION, DELETED) VALUES (?, 0, 0, 0, 1)
+    ON CONFLICT (NAME) DO NOTHING'''
+SQL_SELECT_EXERCISES    = '''
+    SELECT NAME, REPS, SETS, DURATION, DESCRIPTION, IMAGE_PATH, BODYPARTS, ANGLES
+    FROM EXERCISE WHERE DELETED = 0 ORDER BY EXERCISE_ID'''
+SQL_INSERT_ROUTINE      = 'INSERT INTO ROUTINE (NAME, DESCRIPTION) VALUES (?, ?)'
+SQL_INSERT_ROUTINE_EXER = '''
+    INSERT INTO ROUTINE_EXERCISE (ROUTINE_ID, POSITION, EXERCISE_ID, SETS, REPS)
+    VALUES (?, ?, (SELECT EXERCISE_ID FROM EXERCISE WHERE NAME = ?), ?, ?)'''
+SQL_SELECT_ROUTINES     = 'SELECT ROUTINE_ID, NAME, DESCRIPTION FROM ROUTINE ORDER BY ROUTINE_ID'
+SQL_SELECT_ROUTINE_EXER = '''
+    SELECT RE.ROUTINE_ID, E.NAME, RE.SETS, RE.REPS
+    FROM ROUTINE_EXERCISE RE JOIN EXERCISE E ON E.EXERCISE_ID = RE.EXERCISE_ID
+    ORDER BY RE.ROUTINE_ID, RE.POSITION'''
+SQL_INSERT_USER         = 'INSERT INTO USER_PROFILE (NAME) VALUES (?) ON CONFLICT (NAME) DO NOTHING'
+SQL_SELECT_USERS        = 'SELECT NAME FROM USER_PROFILE ORDER BY USER_ID'
+SQL_INSERT_SCORE        = '''
+    INSERT INTO SCORE_HISTORY (USER_ID, EXERCISE_ID, SCORE)
+    VALUES ((SELECT USER_ID FROM USER_PROFILE WHERE NAME = ?),
+            (SELECT EXERCISE_ID FROM EXERCISE WHERE NAME = ?), ?)'''
+SQL_SELECT_USER_SCORES  = '''
+    SELECT E.NAME, S.SCORE
+    FROM SCORE_HISTORY S
+    JOIN EXERCISE E ON E.EXERCISE_ID = S.EXERCISE_ID
+    WHERE S.USER_ID = (SELECT USER_ID FROM USER_PROFILE WHERE NAME = ?)
+    ORDER BY S.SCORE_ID'''
+
+def connect(path: str = None) -> sqlite3.Connection:
+    '''
+    Returns the shared connection, creating the database and its
+    tables on first use. The connection is in WAL mode, so readers
+    do not block the writer, and may be used from any thread while
+    holding sqlite_handler._lock.
+    '''
+    global _connection
+    with _lock:
+        if _connection is not None:
+            return _connection
+
+        path        = path or app_config.db['user_profile']
+        directory   = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok = True)
+
+        connection  = sqlite3.connect(path, check_same_thread = False)
+        connection.execute('PRAGMA journal_mode = WAL')
+        connection.execute('PRAGMA synchronous = NORMAL')
+        connection.execute('PRAGMA foreign_keys = ON')
+        with open(app_config.db_cursor['user_profile'], 'r') as content:
+            connection.executescript(content.read())
+        # Databases created before exercises were soft-deleted.
+        columns     = [row[1] for row in connection.execute('PRAGMA table_info(EXERCISE)')]
+        if 'DELETED' not in columns:
+            connection.execute('ALTER TABLE EXERCISE ADD COLUMN DELETED INTEGER NOT NULL DEFAULT 0')
+        connection.commit()
+
+        _connection = connection
+        return connection
+
+def close():
+    global _connection
+    with _lock:
+        if _connection is not None:
+            _connection.close()
+            _connection = None
+
+def is_empty(connection: sqlite3.Connection = None) -> bool:
+    connection  = connection or connect()
+    with _lock:
+        row     = connection.execute('SELECT COUNT(*) FROM EXERCISE').fetchone()
+    return row[0] == 0
+
+def _exercise_row(exercise: ExerciseDetails) -> tuple:
+    return (exercise.name,
+            int(exercise.reps),
+            int(exercise.sets),
+            int(exercise.duration),
+            exercise.description or "",
+            exercise.img_path or "",
+            json.dumps(exercise.body or []),
+            json.dumps(exercise.angle or []))
+
+def import_json(connection: sqlite3.Connection = None):
+    '''
+    Copies exercises.json, routines.json and users.json, plus the
+    score store, into the database in one transaction. Rows that
+    already exist are updated (exercises) or kept (routines, users);
+    score histories are only imported for users that are not in the
+    database yet.
+
+    Scores and routine entries may name exercises that have been
+    removed from exercises.json. Those exercises are added as
+    deleted, so their rows are kept like those of exercises removed
+    from the database.
+    '''
+    connection  = connection or connect()
+    with open(app_config.json['content'], 'r') as json_file:
+        exercises   = [ExerciseDetails.convert(exer_dict) for exer_dict in json.load(json_file)]
+    with open(app_config.json['routines'], 'r') as json_file:
+        routines    = json.load(json_file)
+    with open(app_config.json['user'], 'r') as json_file:
+        users       = json.load(json_file)
+
+    histories       = {user_dict['username']: user_dict for user_dict in users}
+    store           = ScoreStore(app_config.db['scores'])
+    for username in store.users:
+        user_dict   = histories.get(username)
+        if user_dict is None:
+            user_dict   = {'username': username, 'exercises': []}
+            histories[username]     = user_dict
+            users.append(user_dict)
+        for exer_name, records in store.history(username).items():
+            user_dict['exercises'].append({'name': exer_name, 'score': records['score'].tolist()})
+
+    known           = {exercise.name for exercise in exercises}
+    removed         = {exer_dict['name']
+                       for routine_dict in routines
+                       for exer_dict in (routine_dict['exercises'] or [])} | \
+                      {exer_dict['name']
+                       for user_dict in users
+                       for exer_dict in user_dict['exercises']}
+    removed        -= known
+
+    with _lock, connection:
+        connection.executemany(SQL_UPSERT_EXERCISE, [_exercise_row(exercise) for exercise in exercises])
+        connection.executemany(SQL_INSERT_REMOVED_EXER, [(exer_name,) for exer_name in sorted(removed)])
+        if removed:
+            print(f"FitQuest >> Importing {len(removed)} removed exercises as deleted: "
+                  f"{', '.join(sorted(removed))}")
+
+        known       = {row[0] for row in connection.execute('SELECT NAME FROM ROUTINE')}
+        for routine_dict in routines:
+            if routine_dict['routine_name'] in known:
+                continue
+            cursor      = connection.execute(SQL_INSERT_ROUTINE, (routine_dict['routine_name'],
+                                                                  routine_dict['routine_description']))
+            connection.executemany(SQL_INSERT_ROUTINE_EXER, [
+                (cursor.lastrowid, position, exer_dict['name'], int(exer_dict['sets']), int(exer_dict['reps']))
+                for position, exer_dict in enumerate(routine_dict['exercises'] or [])
+            ])
+
+        known       = {row[0] for row in connection.execute(SQL_SELECT_USERS)}
+        for user_dict in users:
+            if user_dict['username'] in known:
+                continue
+            connection.execute(SQL_INSERT_USER, (user_dict['username'],))
+            connection.executemany(SQL_INSERT_SCORE, [
+                (user_dict['username'], exer_dict['name'], float(score))
+                for exer_dict in user_dict['exercises']
+                for score in exer_dict['score']
+            ])
+
+    print(f"FitQuest >> Imported {len(exercises)} exercises, {len(routines)} routines "
+          f"and {len(users)} users into {app_config.db['user_profile']}")
+
+class SQLiteExercise:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance    = super(SQLiteExercise, cls).__new__(cls)
+        return cls.instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized   = True
+        self.connection     = connect()
+        with _lock:
+            rows            = self.connection.execute(SQL_SELECT_EXERCISES).fetchall()
+
+        self.json_list      = []
+        for name, reps, sets, duration, description, img_path, body, angle in rows:
+            exercise        = ExerciseDetails(name, reps, sets, duration, description,
+                                              json.loads(body), json.loads(angle), img_path)
+            self.json_list.append(exercise)
+        self._index         = {exercise.name: exercise for exercise in self.json_list}
+
+    def extract_list(self) -> list[ExerciseDetails]:
+        ret_list    = []
+        for exercise in self.json_list:
+            ret_list.append(exercise)
+        return ret_list
+
+    def extract_names(self) -> list[str]:
+        ret_list    = []
+        for names in self.json_list:
+            ret_list.append(names.name)
+        return ret_list
+
+    def update(self):
+        with _lock, self.connection:
+            self.connection.executemany(SQL_UPSERT_EXERCISE,
+                                        [_exercise_row(exercise) for exercise in self.json_list])
+
+    def get_exercise(self, exer_name: str) -> ExerciseDetails:
+        return self._index.get(exer_name)
+
+    def remove_exercise(self, exer_name: str):
+        exercise    = self._index.pop(exer_name, None)
+        if exercise is None:
+            return
+
+        self.json_list.remove(exercise)
+        with _lock, self.connection:
+            self.connection.execute(SQL_DELETE_EXERCISE, (exer_name,))
+
+    def add_exercise(self,
+                     exer_name: str,
+                     exer_reps: int,
+                     exer_sets: int,
+                     exer_dur : int,
+                     exer_desc: str,
+                     body_arr : list[str] = None,
+                     angle_arr: list[float] = None):
+        # Same behaviour as JSONExercise.add_exercise: an existing
+        # exercise is changed in memory only, until update().
+        exercise    = self.get_exercise(exer_name)
+        if exercise is not None:
+            exercise.reps           = exer_reps
+            exercise.sets           = exer_sets
+            exercise.duration       = exer_dur
+            exercise.description    = exer_desc
+            exercise.set_exercise_dict_params(body_arr, angle_arr)
+            return exercise
+
+        exercise    = ExerciseDetails(
+            exer_name   = exer_name,
+            exer_reps   = exer_reps,
+            exer_sets   = exer_sets,
+            exer_dur    = exer_dur,
+            exer_desc   = exer_desc,
+        )
+        exercise.set_exercise_dict_params(body_arr, angle_arr)
+
+        self.json_list.append(exercise)
+        self._index[exer_name]  = exercise
+        with _lock, self.connection:
+            self.connection.execute(SQL_UPSERT_EXERCISE, _exercise_row(exercise))
+        return exercise
+
+# This class must operate after SQLiteExercise
+class SQLiteRoutine:
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance    = super(SQLiteRoutine, cls).__new__(cls)
+        return cls.instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized   = True
+        self.connection     = connect()
+        with _lock:
+            routines        = self.connection.execute(SQL_SELECT_ROUTINES).fetchall()
+            entries         = self.connection.execute(SQL_SELECT_ROUTINE_EXER).fetchall()
+
+        exer_lists          = {routine_id: [] for routine_id, _, _ in routines}
+        json_exer           = SQLiteExercise()
+        for routine_id, exer_name, sets, reps in entries:
+            base_obj            = json_exer.get_exercise(exer_name)
+            if base_obj is None:
+                # Removed; kept in the database in case it comes back.
+                continue
+            exer_obj            = base_obj.copy()
+            exer_obj.sets       = int(sets)
+            exer_obj.reps       = int(reps)
+            exer_obj.duration   = int(base_obj.duration)
+            exer_lists[routine_id].append(exer_obj)
+
+        self.rout_list      = [RoutineDetails(name, description, exer_lists[routine_id])
+                               for routine_id, name, description in routines]
+
+    def extract_list(self) -> list[RoutineDetails]:
+        ret_list    = []
+        for routine in self.rout_list:
+            ret_list.append(routine)
+        return ret_list
+
+class SQLiteUser:
+    '''
+    Users from the database. Startup only reads the usernames; a
+    user's score history is queried the first time it is used (see
+    UserDetails), and at most app_config.user_cache stay loaded.
+    '''
+    def __new__(cls):
+        if not hasattr(cls, 'instance'):
+            cls.instance    = super(SQLiteUser, cls).__new__(cls)
+        return cls.instance
+
+    def __init__(self):
+        if hasattr(self, '_initialized'):
+            return
+        self._initialized   = True
+        self.connection     = connect()
+        with _lock:
+            names           = [row[0] for row in self.connection.execute(SQL_SELECT_USERS)]
+
+        self.user_list      = [UserDetails(name, self._load_user) for name in names]
+        self._index         = {user.username: user for user in self.user_list}
+
+        # Scores queued for the database, per user and exercise, for
+        # the loaded users; update() queues the ones after these. The
+        # persistence worker inserts the queued rows.
+        self._saved         = {}
+        self._rows          = []
+        self._rows_lock     = Lock()
+        self._cache         = UserCache(app_config.user_cache, self._evict)
+
+    def _load_user(self, user: UserDetails):
+        with self._rows_lock:
+            pending         = any(row[0] == user.username for row in self._rows)
+        if pending:
+            # Its last scores are still on their way to the database.
+            PersistenceWorker().flush()
+
+        with _lock:
+            scores          = self.connection.execute(SQL_SELECT_USER_SCORES, (user.username,)).fetchall()
+
+        histories           = {}
+        for exer_name, score in scores:
+            histories.setdefault(exer_name, []).append(score)
+
+        json_exer           = SQLiteExercise()
+        for exer_name, score_list in histories.items():
+            exercise        = json_exer.get_exercise(exer_name)
+            if exercise is None:
+                # Removed; the scores stay in the database.
+                continue
+            user.add_exercise(exercise, score_list)
+
+        self._saved[user.username]  = {exer_dict['name']: len(exer_dict['score'])
+                                       for exer_dict in user.exercises}
+        self._cache.touch(user)
+
+    def _evict(self, user: UserDetails):
+        self._insert([user])
+        del self._saved[user.username]
+
+    def extract_list(self) -> list[UserDetails]:
+        ret_list    = []
+        for user in self.user_list:
+            ret_list.append(user)
+        return ret_list
+
+    def get_user(self, query_username: str) -> UserDetails|None:
+        user    = self._index.get(query_username)
+        if (user is not None) and user.loaded:
+            self._cache.touch(user)
+        return user
+
+    def get_user_count(self) -> int:
+        return len(self.user_list)
+
+    def update(self):
+        '''
+        Queues the scores added since the last update and returns;
+        the persistence worker inserts them. Only loaded users can have
+        any.
+        '''
+        self._insert(self._cache.users())
+
+    def _insert(self, users: list[UserDetails]):
+        scores              = []
+        for user in users:
+            saved           = self._saved[user.username]
+            for exer_dict in user.exercises:
+                score_list  = exer_dict['score']
+                for score in score_list[saved.get(exer_dict['name'], 0):]:
+                    scores.append((user.username, exer_dict['name'], float(score)))
+                saved[exer_dict['name']]    = len(score_list)
+
+        if len(scores) == 0:
+            return
+        with self._rows_lock:
+            self._rows.extend(scores)
+        PersistenceWorker().mark_dirty(app_config.db['user_profile'], self._write_rows)
+
+    def _write_rows(self):
+        with self._rows_lock:
+            scores          = list(self._rows)
+
+        with _lock, self.connection:
+            self.connection.executemany(SQL_INSERT_USER, {(username,) for username, _, _ in scores})
+            self.connection.executemany(SQL_INSERT_SCORE, scores)
+
+        # Dropped only once stored, so _load_user waits for them.
+        with self._rows_lock:
+            del self._rows[:len(scores)]
+
+def main(argv = None) -> int:
+    parser  = argparse.ArgumentParser(description="Manage the FitQuest SQLite database.")
+    parser.add_argument('--import', dest='do_import', action='store_true',
+                        help="import the JSON files into the database")
+    args    = parser.parse_args(argv)
+
+    connect()
+    if args.do_import:
+        import_json()
+    close()
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,15 @@
+'''
+The storage classes selected by app_config.storage: 'json' for the
+JSON files (json_handler), 'sqlite' for the database (sqlite_handler).
+Both provide the same interface.
+'''
+import admin.app_config as app_config
+
+if app_config.storage == 'sqlite':
+    from admin.sqlite_handler import (SQLiteExercise as Exercise,
+                                      SQLiteRoutine as Routine,
+                                      SQLiteUser as User)
+else:
+    from admin.json_handler import (JSONExercise as Exercise,
+                                    JSONRoutine as Routine,
+                                    JSONUser as User)
\ No newline at end of file
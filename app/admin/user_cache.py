@@ -0,0 +1,37 @@
+from collections import OrderedDict
+from typing import Callable
+
+from user_details import UserDetails
+
+class UserCache:
+    '''
+    Bounded LRU of the users whose score histories are loaded.
+
+    touch(user) marks a loaded user as the most recently used. Past
+    capacity, the least recently used user is passed to on_evict,
+    which should save anything not saved yet, and then unloaded.
+    '''
+    def __init__(self, capacity: int, on_evict: Callable[[UserDetails], None] = None):
+        self.capacity   = max(1, capacity)
+        self.on_evict   = on_evict
+        self._users     = OrderedDict()
+
+    def touch(self, user: UserDetails):
+        if user.username in self._users:
+            self._users.move_to_end(user.username)
+            return
+        self._users[user.username]  = user
+        while len(self._users) > self.capacity:
+            _, oldest   = self._users.popitem(last = False)
+            if self.on_evict is not None:
+                self.on_evict(oldest)
+            oldest.unload()
+
+    def users(self) -> list[UserDetails]:
+        return list(self._users.values())
+
+    def __contains__(self, user: UserDetails) -> bool:
+        return user.username in self._users
+
+    def __len__(self) -> int:
+        return len(self._users)
\ No newline at end of file
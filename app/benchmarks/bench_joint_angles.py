@@ -0,0 +1,59 @@
+'''
+Micro-benchmark: joint_angles against the scalar calculate_angle.
+
+Run from the app directory:
+    python -m benchmarks.bench_joint_angles [--frames T] [--repeat N]
+'''
+import argparse
+import timeit
+import numpy as np
+
+from user.pose_detection.pose_handler import (calculate_angle, new_landmark_array,
+                                              RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST,
+                                              RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE)
+from user.pose_detection.joint_angles import angle_table, joint_angles
+
+TABLE   = angle_table((RIGHT_SHOULDER, RIGHT_ELBOW, RIGHT_WRIST),
+                      (RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE),
+                      (RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE))
+
+def scalar_frame(landmarks: np.ndarray) -> list[float]:
+    return [calculate_angle(landmarks[a, :2], landmarks[b, :2], landmarks[c, :2])
+            for a, b, c in TABLE]
+
+def scalar_batch(frames: np.ndarray) -> list[list[float]]:
+    return [scalar_frame(landmarks) for landmarks in frames]
+
+def best_of(stmt, repeat: int, number: int) -> float:
+    '''
+    Returns the best time per call, in microseconds.
+    '''
+    return min(timeit.repeat(stmt, repeat=repeat, number=number)) / number * 1e6
+
+def main(argv = None):
+    parser  = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--frames', type=int, default=1000, help="frames in the (T, K) batch")
+    parser.add_argument('--repeat', type=int, default=5)
+    args    = parser.parse_args(argv)
+
+    rng         = np.random.default_rng(0)
+    landmarks   = new_landmark_array()
+    landmarks[:]    = rng.random(landmarks.shape)
+    frames      = rng.random((args.frames, *landmarks.shape)).astype(np.float32)
+
+    # Both paths must agree before their timings mean anything.
+    np.testing.assert_allclose(joint_angles(frames, TABLE), scalar_batch(frames), atol=1e-3)
+
+    number      = 2000
+    single_old  = best_of(lambda: scalar_frame(landmarks), args.repeat, number)
+    single_new  = best_of(lambda: joint_angles(landmarks, TABLE), args.repeat, number)
+    batch_old   = best_of(lambda: scalar_batch(frames), args.repeat, 1)
+    batch_new   = best_of(lambda: joint_angles(frames, TABLE), args.repeat, 10)
+
+    print(f"{len(TABLE)} angles per frame")
+    print(f"{'':<28}{'calculate_angle':>18}{'joint_angles':>16}{'speedup':>10}")
+    print(f"{'one frame (us)':<28}{single_old:>18.2f}{single_new:>16.2f}{single_old / single_new:>9.1f}x")
+    print(f"{f'{args.frames} frames (us)':<28}{batch_old:>18.1f}{batch_new:>16.1f}{batch_old / batch_new:>9.1f}x")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
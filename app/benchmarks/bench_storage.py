@@ -0,0 +1,136 @@
+'''
+Benchmark: JSON storage startup and lookups against the number of
+users, on synthetic data written to a temporary directory.
+
+Run from the app directory:
+    python -m benchmarks.bench_storage [--users 1000 5000 10000] [--exercises 200]
+
+Startup (JSONExercise, JSONRoutine and JSONUser) only reads the
+usernames and should grow about linearly with the users; so should
+the memory it allocates. A lookup (get_user and get_exercise) should
+take the same time at every size, and so should loading a user's
+score history from the score store the first time it is used. The
+last column times the lookups as a list scan, the way get_user and
+get_exercise used to work.
+'''
+import argparse
+import json
+import os
+import random
+import tempfile
+import tracemalloc
+from time import perf_counter
+
+import admin.app_config as app_config
+import admin.json_handler as json_handler
+from admin.persistence import PersistenceWorker
+from admin.score_store import ScoreStore
+
+def write_data(directory: str, users: int, exercises: int, routines: int,
+               exercises_per_user: int, scores: int) -> dict:
+    rng         = random.Random(0)
+    names       = [f"Exercise {i}" for i in range(exercises)]
+    paths       = {
+        'content'       : os.path.join(directory, 'exercises.json'),
+        'name'          : os.path.join(directory, 'exercises_names.json'),
+        'routines'      : os.path.join(directory, 'routines.json'),
+        'user'          : os.path.join(directory, 'users.json'),
+        'rep_log'       : os.path.join(directory, 'rep_log.jsonl'),
+    }
+    with open(paths['content'], 'w') as json_file:
+        json.dump([{'name': name, 'reps': 10, 'sets': 3, 'duration': 60, 'description': '',
+                    'image_path': '', 'bodypart1': 'right_hip', 'bodypart2': 'right_knee',
+                    'bodypart3': 'right_ankle', 'angle1': 160, 'angle2': 90}
+                   for name in names], json_file)
+    with open(paths['routines'], 'w') as json_file:
+        json.dump([{'routine_name': f"Routine {i}", 'routine_description': '',
+                    'exercises': [{'name': name, 'sets': 2, 'reps': 10}
+                                  for name in rng.sample(names, 5)]}
+                   for i in range(routines)], json_file)
+    with open(paths['user'], 'w') as json_file:
+        json.dump([{'username': f"User {i}", 'exercises': []} for i in range(users)], json_file)
+
+    store       = ScoreStore(os.path.join(directory, 'scores'))
+    for i in range(users):
+        store.append(f"User {i}", [(name, 0.0, rng.random())
+                                   for name in rng.sample(names, exercises_per_user)
+                                   for _ in range(scores)], sync = False)
+    return paths
+
+def reset_singletons():
+    for cls in (json_handler.JSONExercise, json_handler.JSONRoutine, json_handler.JSONUser):
+        if hasattr(cls, 'instance'):
+            del cls.instance
+
+def run(users: int, args) -> dict:
+    with tempfile.TemporaryDirectory() as directory:
+        app_config.json.update(write_data(directory, users, args.exercises, args.routines,
+                                          args.exercises_per_user, args.scores))
+        app_config.db['scores'] = os.path.join(directory, 'scores')
+        reset_singletons()
+
+        # Memory in a separate run, as tracing slows it down.
+        tracemalloc.start()
+        json_handler.JSONUser()
+        memory      = tracemalloc.get_traced_memory()[0]
+        tracemalloc.stop()
+        PersistenceWorker().flush()
+        reset_singletons()
+
+        start       = perf_counter()
+        json_exer   = json_handler.JSONExercise()
+        json_handler.JSONRoutine()
+        json_user   = json_handler.JSONUser()
+        startup     = perf_counter() - start
+
+        rng         = random.Random(1)
+        queries     = [(f"User {rng.randrange(users)}", f"Exercise {rng.randrange(args.exercises)}")
+                       for _ in range(args.lookups)]
+
+        start       = perf_counter()
+        for username, exer_name in queries:
+            json_user.get_user(username)
+            json_exer.get_exercise(exer_name)
+        indexed     = (perf_counter() - start) / len(queries)
+
+        # Distinct users, so every history is loaded from the score store.
+        start       = perf_counter()
+        for i in range(args.loads):
+            json_user.get_user(f"User {i * users // args.loads}").get_exercise(queries[i][1])
+        loading     = (perf_counter() - start) / args.loads
+
+        user_list   = json_user.extract_list()
+        exer_list   = json_exer.extract_list()
+        start       = perf_counter()
+        for username, exer_name in queries[:args.scan_lookups]:
+            next(user for user in user_list if user.username == username)
+            next(exer for exer in exer_list if exer.name == exer_name)
+        scanned     = (perf_counter() - start) / min(len(queries), args.scan_lookups)
+
+        PersistenceWorker().flush()
+        reset_singletons()
+    return {'users': users, 'startup_s': startup, 'memory_mb': memory / 2**20,
+            'lookup_us': indexed * 1e6, 'load_us': loading * 1e6, 'scan_us': scanned * 1e6}
+
+def main(argv = None):
+    parser  = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--users', type=int, nargs='+', default=[1000, 5000, 10000])
+    parser.add_argument('--exercises', type=int, default=200)
+    parser.add_argument('--routines', type=int, default=50)
+    parser.add_argument('--exercises-per-user', type=int, default=10)
+    parser.add_argument('--scores', type=int, default=5, help="scores per user and exercise")
+    parser.add_argument('--lookups', type=int, default=20000)
+    parser.add_argument('--loads', type=int, default=500)
+    parser.add_argument('--scan-lookups', type=int, default=500)
+    args    = parser.parse_args(argv)
+
+    print(f"{'users':>8}{'startup s':>12}{'per user us':>14}{'memory MB':>12}"
+          f"{'lookup us':>12}{'load us':>10}{'list scan us':>15}")
+    for users in args.users:
+        result  = run(users, args)
+        print(f"{result['users']:>8}{result['startup_s']:>12.3f}"
+              f"{result['startup_s'] / users * 1e6:>14.1f}{result['memory_mb']:>12.1f}"
+              f"{result['lookup_us']:>12.2f}{result['load_us']:>10.1f}{result['scan_us']:>15.1f}")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,291 @@
+'''
+Benchmarks every stage of the live exercise path and compares the
+results against a recorded baseline.
+
+Stages, in pipeline order:
+    capture_decode      - decoding a camera frame (video read, or JPEG
+                          decode for synthetic frames, as MJPEG cameras do)
+    preview_model       - CameraPreview.update on a CPUTexture, a model
+                          of the preview's CPU cost, not a measurement of
+                          Kivy: it assumes a GL driver without a BGR
+                          format, where the frame is converted to RGB
+                          bytes before the upload. Kivy's own
+                          Texture.blit_buffer and the GL upload need a
+                          window and are not timed
+    color_convert       - RGBFrameBuffer.convert, the pose input copy
+    pose_inference      - PoseSession.process
+    landmark_extraction - extract_landmarks into the session array
+    joint_angles        - all of a detector's angles for one frame
+    rep_logic           - every loaded detector's on_pose
+
+Inputs are test_video.mp4 and synthetic frames at 480p, 720p and
+1080p. Run from the app directory:
+
+    python -m benchmarks.pose_pipeline --output bench.json
+    python -m benchmarks.pose_pipeline --write-baseline
+    python -m benchmarks.pose_pipeline --threshold 0.25
+
+The last form exits with status 1 if the p50 of any stage is more
+than 25% slower than in benchmarks/baseline.json, and with status 2
+if there is no baseline. No baseline is committed: record it with
+--write-baseline on the reference kiosk hardware, as numbers from
+other machines are not comparable. Where no baseline has been
+recorded yet, e.g. a CI job on a fresh checkout, pass
+--allow-missing-baseline to only print the results and exit 0.
+'''
+import argparse
+import json
+import os
+import platform
+import sys
+import types
+from time import perf_counter
+import cv2
+import numpy as np
+
+os.environ.setdefault('KIVY_NO_ARGS', '1')
+from user.camera.camera_preview import CameraPreview
+import user.load_pose_detection as load_pose_detection
+from exercise_details import ExerciseDetails
+from user.camera.frame_format import RGBFrameBuffer
+from user.camera.frame_source import iter_frames
+from user.pose_detection.pose_handler import (PoseSession, extract_landmarks, new_landmark_array,
+                                              LANDMARK_COUNT)
+from user.pose_detection.joint_angles import joint_angles
+
+BENCH_DIR           = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_BASELINE    = os.path.join(BENCH_DIR, 'baseline.json')
+DEFAULT_VIDEO       = os.path.join(BENCH_DIR, '..', '..', 'test_video.mp4')
+DEFAULT_EXERCISES   = os.path.join(BENCH_DIR, '..', '..', 'exercises.json')
+
+RESOLUTIONS         = {
+    '480p'          : (640, 480),
+    '720p'          : (1280, 720),
+    '1080p'         : (1920, 1080),
+}
+
+def summarize(samples: list[float]) -> dict:
+    '''
+    Turns per-call timings in seconds into milliseconds statistics.
+    '''
+    samples     = np.asarray(samples) * 1000.0
+    return {
+        'calls'     : int(len(samples)),
+        'mean_ms'   : float(samples.mean()),
+        'p50_ms'    : float(np.percentile(samples, 50)),
+        'p95_ms'    : float(np.percentile(samples, 95)),
+    }
+
+def time_calls(fn, inputs) -> list[float]:
+    samples     = []
+    for value in inputs:
+        start   = perf_counter()
+        fn(value)
+        samples.append(perf_counter() - start)
+    return samples
+
+def synthetic_frames(width: int, height: int, count: int) -> list[np.ndarray]:
+    '''
+    Gradient frames with a little noise, so JPEG sizes are closer to
+    a real camera than plain noise or flat colour.
+    '''
+    rng         = np.random.default_rng(0)
+    x           = np.linspace(0, 255, width, dtype=np.float32)
+    y           = np.linspace(0, 255, height, dtype=np.float32)[:, None]
+    base        = np.stack(np.broadcast_arrays(x + 0 * y, y + 0 * x, (x + y) / 2), axis=-1)
+    frames      = []
+    for _ in range(count):
+        noise   = rng.normal(0, 8, base.shape).astype(np.float32)
+        frames.append(np.clip(base + noise, 0, 255).astype(np.uint8))
+    return frames
+
+def synthetic_results(landmarks: np.ndarray):
+    '''
+    A stand-in for MediaPipe results, for timing extraction on
+    frames where no person was detected.
+    '''
+    points  = [types.SimpleNamespace(x=row[0], y=row[1], z=row[2], visibility=row[3])
+               for row in landmarks.tolist()]
+    return types.SimpleNamespace(pose_landmarks=types.SimpleNamespace(landmark=points))
+
+class CPUTexture:
+    '''
+    Stands in for the Kivy texture of CameraPreview without a window.
+    blit_buffer models the CPU work a driver without a BGR format
+    would need before the GL upload: convert the buffer to RGB bytes.
+    It is an estimate, not Kivy's code path.
+    '''
+    def __init__(self, width: int, height: int):
+        self.size   = (width, height)
+
+    def blit_buffer(self, pbuffer, colorfmt: str = 'rgb', bufferfmt: str = 'ubyte'):
+        width, height   = self.size
+        frame           = np.frombuffer(pbuffer, dtype=np.uint8).reshape(height, width, 3)
+        if colorfmt == 'bgr':
+            frame       = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+        frame.tobytes()
+
+def bench_frames(frames: list[np.ndarray], decode_samples: list[float],
+                 detectors: list, session: PoseSession) -> dict:
+    stages          = {'capture_decode': summarize(decode_samples)}
+
+    height, width   = frames[0].shape[:2]
+    image           = types.SimpleNamespace(texture=None,
+                                            canvas=types.SimpleNamespace(ask_update=lambda: None))
+    preview         = CameraPreview(image)
+    preview._texture    = CPUTexture(width, height)
+    stages['preview_model']     = summarize(time_calls(preview.update, frames))
+
+    pose_input      = RGBFrameBuffer()
+    images          = []
+    def convert(frame):
+        images.append(pose_input.convert(frame).copy())
+    stages['color_convert']     = summarize(time_calls(convert, frames))
+
+    results_list    = []
+    def infer(image):
+        results_list.append(session.process(image))
+    stages['pose_inference']    = summarize(time_calls(infer, images))
+
+    found           = [results for results in results_list
+                       if (results is not None) and (results.pose_landmarks is not None)]
+    if len(found) == 0:
+        rng         = np.random.default_rng(0)
+        found       = [synthetic_results(rng.random((LANDMARK_COUNT, 4)).astype(np.float32))
+                       for _ in range(len(frames))]
+
+    landmarks       = new_landmark_array()
+    stages['landmark_extraction']   = summarize(time_calls(
+        lambda results: extract_landmarks(results, landmarks), found))
+
+    landmark_frames = [extract_landmarks(results) for results in found]
+    tables          = [detector.joints for detector in detectors]
+    stages['joint_angles']          = summarize(time_calls(
+        lambda frame: [joint_angles(frame, table) for table in tables], landmark_frames))
+
+    def rep_logic(frame):
+        for detector in detectors:
+            detector.on_pose(frame, detector.new_result())
+    stages['rep_logic']             = summarize(time_calls(rep_logic, landmark_frames))
+    return stages
+
+def load_detectors(json_path: str) -> list:
+    with open(json_path, 'r') as json_file:
+        exer_list   = [ExerciseDetails.convert(exer_dict) for exer_dict in json.load(json_file)]
+    load_pose_detection.load(exer_list)
+    return [exercise.detector for exercise in exer_list if exercise.detector is not None]
+
+def run(video: str, exercises: str, frame_count: int) -> dict:
+    detectors   = load_detectors(exercises)
+    suites      = {}
+
+    with PoseSession() as session:
+        if os.path.exists(video):
+            frames, decode_samples  = [], []
+            source                  = iter_frames(video, frame_count)
+            while True:
+                start   = perf_counter()
+                frame   = next(source, None)
+                if frame is None:
+                    break
+                decode_samples.append(perf_counter() - start)
+                frames.append(frame)
+            if frames:
+                suites['video']     = bench_frames(frames, decode_samples, detectors, session)
+        else:
+            print(f"FitQuest >> {video} not found, skipping the video suite.")
+
+    for label, (width, height) in RESOLUTIONS.items():
+        # A fresh session per resolution, so tracking state from the
+        # previous suite does not carry over.
+        with PoseSession() as session:
+            frames      = synthetic_frames(width, height, frame_count)
+            encoded     = [cv2.imencode('.jpg', frame)[1] for frame in frames]
+            decode      = time_calls(lambda data: cv2.imdecode(data, cv2.IMREAD_COLOR), encoded)
+            suites[label]   = bench_frames(frames, decode, detectors, session)
+
+    return {
+        'meta'      : {
+            'machine'   : platform.node(),
+            'platform'  : platform.platform(),
+            'processor' : platform.processor(),
+            'python'    : platform.python_version(),
+            'opencv'    : cv2.__version__,
+            'numpy'     : np.__version__,
+            'frames'    : frame_count,
+        },
+        'suites'    : suites,
+    }
+
+def compare(current: dict, baseline: dict, threshold: float, min_ms: float = 0.0) -> list[str]:
+    '''
+    Returns one line per stage whose p50 regressed by more than
+    threshold (a fraction) against the baseline. Stages faster than
+    min_ms in both runs are too noisy to compare and are skipped.
+    '''
+    regressions = []
+    for suite, stages in current['suites'].items():
+        base_stages = baseline.get('suites', {}).get(suite, {})
+        for stage, stats in stages.items():
+            base    = base_stages.get(stage)
+            if (base is None) or (base['p50_ms'] <= 0):
+                continue
+            if max(stats['p50_ms'], base['p50_ms']) < min_ms:
+                continue
+            ratio   = stats['p50_ms'] / base['p50_ms']
+            if ratio > 1.0 + threshold:
+                regressions.append(f"{suite}/{stage}: p50 {stats['p50_ms']:.3f} ms vs "
+                                   f"{base['p50_ms']:.3f} ms baseline ({(ratio - 1.0) * 100:+.0f}%)")
+    return regressions
+
+def print_suites(report: dict):
+    print(f"{'suite':<8}{'stage':<22}{'mean ms':>10}{'p50 ms':>10}{'p95 ms':>10}")
+    for suite, stages in report['suites'].items():
+        for stage, stats in stages.items():
+            print(f"{suite:<8}{stage:<22}{stats['mean_ms']:>10.3f}{stats['p50_ms']:>10.3f}{stats['p95_ms']:>10.3f}")
+
+def main(argv = None) -> int:
+    parser  = argparse.ArgumentParser(description="Benchmark the FitQuest pose pipeline.")
+    parser.add_argument('--video', default=DEFAULT_VIDEO)
+    parser.add_argument('--exercises-json', default=DEFAULT_EXERCISES)
+    parser.add_argument('--frames', type=int, default=60, help="frames per suite (default: %(default)s)")
+    parser.add_argument('--output', default=None, help="write this run's results as JSON")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE)
+    parser.add_argument('--write-baseline', action='store_true',
+                        help="store this run as the new baseline instead of comparing")
+    parser.add_argument('--allow-missing-baseline', action='store_true',
+                        help="exit 0 instead of 2 when there is no baseline to compare with")
+    parser.add_argument('--threshold', type=float, default=0.20,
+                        help="allowed p50 slowdown per stage, as a fraction (default: %(default)s)")
+    parser.add_argument('--min-ms', type=float, default=0.05,
+                        help="skip stages whose p50 is below this in both runs (default: %(default)s)")
+    args    = parser.parse_args(argv)
+
+    report  = run(args.video, args.exercises_json, args.frames)
+    print_suites(report)
+
+    if args.output is not None:
+        with open(args.output, 'w') as json_file:
+            json_file.write(json.dumps(report, indent = 4))
+
+    if args.write_baseline:
+        with open(args.baseline, 'w') as json_file:
+            json_file.write(json.dumps(report, indent = 4))
+        print(f"FitQuest >> Baseline written to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print(f"FitQuest >> No baseline at {args.baseline}; run with --write-baseline first.",
+              file=sys.stderr)
+        return 0 if args.allow_missing_baseline else 2
+
+    with open(args.baseline, 'r') as json_file:
+        baseline    = json.load(json_file)
+
+    regressions = compare(report, baseline, args.threshold, args.min_ms)
+    for line in regressions:
+        print(f"FitQuest >> Regression: {line}", file=sys.stderr)
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
\ No newline at end of file
@@ -17,6 +17,15 @@ class ExerciseDetails:
         self.angle          = angle_arr
         self.img_path       = img_path
         self.check          = None
+        self.detector       = None
+
+    def set_detector(self, detector):
+        '''
+        Attaches a pose detector (see user.pose_detection.pose_handler.PoseDetector)
+        whose check method becomes this exercise's check.
+        '''
+        self.detector       = detector
+        self.check          = None if (detector is None) else detector.check
 
     def set_exercise_dict_params(self,
                                  body_arr: list[str] = None,
@@ -55,5 +64,9 @@ class ExerciseDetails:
                                       self.body,
                                       self.angle,
                                       self.img_path)
-        _obj_copy.check = self.check
+        if self.detector is not None:
+            # Copies count reps on their own.
+            _obj_copy.set_detector(self.detector.copy())
+        else:
+            _obj_copy.check = self.check
         return _obj_copy
@@ -0,0 +1,171 @@
+'''
+Headless replay: runs the exercise detectors over a video file or
+a directory of frames, without Kivy or a camera.
+
+Run from the app directory, e.g.
+    python replay.py ../test_video.mp4 --exercise Squats --json replay.json
+
+The pose session is set up from user_config as in ExerciseScreen:
+person cropping, landmark smoothing and the inference scheduler. Frame
+times come from --fps, so the smoothing sees the recording's pace and
+not the replay's.
+
+For every exercise it reports the rep count, the average
+process_score (the value stored as the set's score), and the
+throughput of the detection path: frames per second and p50/p95
+latency per frame. --json also writes the per-frame angles, return
+codes and scores.
+'''
+import argparse
+import json
+import os
+import sys
+from time import perf_counter
+import numpy as np
+
+import admin.app_config as app_config
+from exercise_details import ExerciseDetails
+import user.load_pose_detection as load_pose_detection
+from user.camera.frame_format import RGBFrameBuffer
+from user.camera.frame_source import iter_frames
+from user.pose_detection.pose_handler import PoseSession
+from user.pose_detection.scheduler import InferenceScheduler
+from user.pose_detection.scoring import SetStats
+import user.user_config as user_config
+
+# app_config paths are relative to the repository root.
+ROOT_DIR            = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..')
+DEFAULT_EXERCISES   = os.path.normpath(os.path.join(ROOT_DIR, app_config.json['content']))
+
+class ExerciseReplay:
+    '''
+    Replays frames through one exercise's detector, with its own
+    PoseSession and InferenceScheduler, the way
+    ExerciseScreen.process_feed does.
+    '''
+    def __init__(self, exercise: ExerciseDetails, keep_frames: bool = False):
+        self.exercise       = exercise
+        self.session        = PoseSession(crop_to_person = user_config.roi_cropping,
+                                          smoothing = user_config.landmark_smoothing,
+                                          min_cutoff = user_config.smoothing_cutoff,
+                                          beta = user_config.smoothing_beta)
+        self.scheduler      = InferenceScheduler(self.session,
+                                                 every = exercise.detector.infer_every,
+                                                 max_every = user_config.max_infer_every)
+        self.keep_frames    = keep_frames
+        self.frames         = []
+        self.latency        = []
+        self.stats          = SetStats()
+        exercise.detector.reset()
+
+    def feed(self, index: int, image: np.ndarray, timestamp: float):
+        start       = perf_counter()
+        result      = self.exercise.check(image, self.scheduler, timestamp)
+        self.latency.append(perf_counter() - start)
+
+        score       = self.stats.add(result)
+
+        if self.keep_frames:
+            self.frames.append({
+                'frame'     : index,
+                'ret_code'  : int(result.ret_code),
+                'angle'     : float(result.angle),
+                'angles'    : result.angles.tolist(),
+                'visibility': result.visibility,
+                'stage'     : result.stage,
+                'score'     : score,
+            })
+
+    def close(self):
+        self.session.close()
+
+    def report(self) -> dict:
+        latency     = np.asarray(self.latency) * 1000.0
+        total       = float(latency.sum()) / 1000.0
+        report      = {
+            'exercise'      : self.exercise.name,
+            'frames'        : len(latency),
+            'reps'          : self.stats.reps,
+            'score'         : self.stats.average,
+            'score_std'     : self.stats.score.std,
+            'depth'         : self.stats.depth.mean,
+            'fps'           : (len(latency) / total) if total > 0 else 0.0,
+            'latency_ms'    : {
+                'p50'       : float(np.percentile(latency, 50)) if len(latency) else 0.0,
+                'p95'       : float(np.percentile(latency, 95)) if len(latency) else 0.0,
+            },
+        }
+        if self.keep_frames:
+            report['per_frame'] = self.frames
+        return report
+
+def load_exercises(json_path: str, names: list[str] = None) -> list[ExerciseDetails]:
+    '''
+    Reads exercises without going through JSONExercise, which
+    rewrites the file on load. Only exercises with a detector are
+    returned.
+    '''
+    with open(json_path, 'r') as json_file:
+        exer_list   = [ExerciseDetails.convert(exer_dict) for exer_dict in json.load(json_file)]
+
+    if names:
+        missing     = set(names) - {exercise.name for exercise in exer_list}
+        if missing:
+            raise ValueError(f"Unknown exercise(s): {', '.join(sorted(missing))}")
+        exer_list   = [exercise for exercise in exer_list if exercise.name in names]
+
+    load_pose_detection.load(exer_list)
+    return [exercise for exercise in exer_list if exercise.detector is not None]
+
+def replay(source: str, exer_list: list[ExerciseDetails], limit: int = None,
+           keep_frames: bool = False, fps: float = 30.0) -> list[dict]:
+    replays     = [ExerciseReplay(exercise, keep_frames) for exercise in exer_list]
+    pose_input  = RGBFrameBuffer()
+    try:
+        for index, frame in enumerate(iter_frames(source, limit)):
+            image   = pose_input.convert(frame)
+            for exer_replay in replays:
+                exer_replay.feed(index, image, index / fps)
+    finally:
+        for exer_replay in replays:
+            exer_replay.close()
+
+    return [exer_replay.report() for exer_replay in replays]
+
+def print_reports(reports: list[dict]):
+    print(f"{'exercise':<16}{'frames':>8}{'reps':>6}{'score':>8}{'fps':>10}{'p50 ms':>9}{'p95 ms':>9}")
+    for report in reports:
+        print(f"{report['exercise']:<16}{report['frames']:>8}{report['reps']:>6}"
+              f"{report['score']:>8.3f}{report['fps']:>10.1f}"
+              f"{report['latency_ms']['p50']:>9.2f}{report['latency_ms']['p95']:>9.2f}")
+
+def main(argv = None) -> int:
+    parser  = argparse.ArgumentParser(description="Run FitQuest's pose detectors over recorded frames.")
+    parser.add_argument('source', help="video file or directory of frames")
+    parser.add_argument('--exercise', action='append', dest='exercises',
+                        help="exercise name; repeat for several (default: all with a detector)")
+    parser.add_argument('--exercises-json', default=DEFAULT_EXERCISES,
+                        help="exercise definitions (default: %(default)s)")
+    parser.add_argument('--fps', type=float, default=30.0,
+                        help="frame rate of the recording (default: %(default)s)")
+    parser.add_argument('--limit', type=int, default=None, help="stop after this many frames")
+    parser.add_argument('--json', dest='json_path', default=None,
+                        help="write the reports, including per-frame values, to this file")
+    args    = parser.parse_args(argv)
+
+    exer_list   = load_exercises(args.exercises_json, args.exercises)
+    if len(exer_list) == 0:
+        print("FitQuest >> No exercises with a detector to replay.", file=sys.stderr)
+        return 1
+
+    reports     = replay(args.source, exer_list, args.limit,
+                         keep_frames = args.json_path is not None, fps = args.fps)
+    print_reports(reports)
+
+    if args.json_path is not None:
+        with open(args.json_path, 'w') as json_file:
+            json_file.write(json.dumps(reports, indent = 4))
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,25 @@
+import numpy as np
+
+from user.camera.frame_format import RGBFrameBuffer
+
+def test_rgb_buffer_is_reused():
+    frame_buffer    = RGBFrameBuffer()
+    first_frame     = np.zeros((48, 64, 3), dtype=np.uint8)
+    second_frame    = np.full((48, 64, 3), 255, dtype=np.uint8)
+
+    first           = frame_buffer.convert(first_frame)
+    second          = frame_buffer.convert(second_frame)
+
+    assert second is first
+    assert frame_buffer.allocations == 1
+    assert (second == 255).all()
+
+def test_rgb_buffer_swaps_channels():
+    frame           = np.zeros((2, 2, 3), dtype=np.uint8)
+    frame[..., 0]   = 10
+    frame[..., 2]   = 30
+
+    rgb             = RGBFrameBuffer().convert(frame)
+
+    assert (rgb[..., 0] == 30).all()
+    assert (rgb[..., 2] == 10).all()
\ No newline at end of file
@@ -0,0 +1,24 @@
+import numpy as np
+
+from admin.score_store import ScoreStore
+
+def test_history_is_a_view_of_the_files(tmp_path):
+    store           = ScoreStore(str(tmp_path))
+    store.append('User', [('Squats', 1.0, 0.5), ('Lunges', 2.0, 0.25), ('Squats', 3.0, 0.75)])
+
+    history         = ScoreStore(str(tmp_path)).history('User')
+
+    assert list(history) == ['Squats', 'Lunges']
+    assert history['Squats']['score'].tolist() == [0.5, 0.75]
+    assert isinstance(history['Squats'], np.memmap)
+    assert not history['Squats'].flags.writeable
+
+def test_append_after_reading(tmp_path):
+    store           = ScoreStore(str(tmp_path))
+    store.append('User', [('Squats', 1.0, 0.5)])
+    before          = store.history('User')['Squats']
+
+    store.append('User', [('Squats', 2.0, 0.75)])
+
+    assert before['score'].tolist() == [0.5]
+    assert store.history('User')['Squats']['score'].tolist() == [0.5, 0.75]
\ No newline at end of file
@@ -0,0 +1,64 @@
+from user.pose_detection.frame_result import FrameResult
+from user.pose_detection.return_code import ReturnCode
+from user.pose_detection.scoring import SetStats
+
+class ListLog:
+    def __init__(self):
+        self.reps   = []
+
+    def add(self, start, end, low, high):
+        self.reps.append((start, end, low, high))
+
+def frame(timestamp, angle, stage, rep = False):
+    result              = FrameResult()
+    result.timestamp    = timestamp
+    result.found        = True
+    result.angle        = angle
+    result.ideal_angle  = 90
+    result.stage        = stage
+    if rep:
+        result.ret_code = ReturnCode.SUCCESS
+    return result
+
+def test_first_rep_starts_when_the_user_moves():
+    rep_log         = ListLog()
+    set_stats       = SetStats(rep_log = rep_log)
+
+    # Standing still for five seconds before the first squat.
+    for second in range(6):
+        set_stats.add(frame(float(second), 170.0, 'down'))
+    set_stats.add(frame(6.0, 140.0, 'down'))
+    set_stats.add(frame(7.0, 80.0, 'up'))
+    set_stats.add(frame(8.0, 170.0, 'down', rep = True))
+
+    assert set_stats.reps == 1
+    assert rep_log.reps[0][:2] == (6.0, 8.0)
+
+def test_rep_on_the_first_frame_has_a_start():
+    rep_log         = ListLog()
+    set_stats       = SetStats(rep_log = rep_log)
+
+    set_stats.add(frame(1.0, 170.0, 'down', rep = True))
+
+    assert rep_log.reps[0][:2] == (1.0, 1.0)
+
+def test_merged_sets_match_one_stream():
+    first           = SetStats()
+    second          = SetStats()
+    together        = SetStats()
+    for timestamp, angle in enumerate((170.0, 120.0, 80.0, 130.0)):
+        first.add(frame(float(timestamp), angle, 'down'))
+        together.add(frame(float(timestamp), angle, 'down'))
+    for timestamp, angle in enumerate((90.0, 175.0)):
+        second.add(frame(float(timestamp), angle, 'up', rep = True))
+        together.add(frame(float(timestamp), angle, 'up', rep = True))
+
+    totals          = SetStats()
+    totals.merge(first)
+    totals.merge(second)
+
+    assert totals.reps == together.reps == 2
+    assert abs(totals.average - together.average) < 1e-9
+    assert abs(totals.score.variance - together.score.variance) < 1e-9
+    assert totals.score.min == together.score.min
+    assert totals.score.max == together.score.max
\ No newline at end of file
@@ -0,0 +1,145 @@
+import cv2
+import numpy as np
+from threading import Thread, Lock, Event
+from time import monotonic
+from typing import Callable
+
+class FrameRing:
+    '''
+    A small ring of preallocated frame buffers with a timestamp
+    and a sequence number for each slot.
+
+    The writer fills the slot returned by next_slot() and then
+    publishes it with commit(). Readers call latest() to get a
+    view of the newest published frame. A view stays valid until
+    the writer wraps around to the same slot, i.e. for (size - 1)
+    more frames, so readers that keep a frame for longer than that
+    should copy it.
+    '''
+    def __init__(self, size: int = 4):
+        if size < 2:
+            raise ValueError("FrameRing needs at least 2 slots.")
+        self.size       = size
+        self._frames    = None
+        self._stamps    = np.zeros(size, dtype=np.float64)
+        self._seq       = -1
+        self._lock      = Lock()
+
+    def _allocate(self, shape, dtype):
+        self._frames    = np.empty((self.size, *shape), dtype=dtype)
+        self._stamps[:] = 0.0
+
+    def next_slot(self, shape = None, dtype = np.uint8) -> np.ndarray|None:
+        '''
+        Returns the buffer the next frame should be written into.
+        If shape is given and differs from the allocated frames,
+        the ring is reallocated. Returns None if nothing has been
+        allocated yet and no shape was given.
+        '''
+        if (shape is not None) and ((self._frames is None) or
+                                    (self._frames.shape[1:] != tuple(shape)) or
+                                    (self._frames.dtype != dtype)):
+            with self._lock:
+                self._allocate(shape, dtype)
+                self._seq   = -1
+
+        if self._frames is None:
+            return None
+        return self._frames[(self._seq + 1) % self.size]
+
+    def commit(self, timestamp: float) -> int:
+        '''
+        Publishes the slot returned by the last next_slot() call.
+        Returns the sequence number of the new frame.
+        '''
+        with self._lock:
+            seq                             = self._seq + 1
+            self._stamps[seq % self.size]   = timestamp
+            self._seq                       = seq
+        return seq
+
+    def latest(self) -> tuple[int, float, np.ndarray|None]:
+        '''
+        Returns (sequence number, timestamp, frame view) of the
+        newest frame, or (-1, 0.0, None) if there is none yet.
+        '''
+        with self._lock:
+            seq     = self._seq
+            if (seq < 0) or (self._frames is None):
+                return (-1, 0.0, None)
+            index   = seq % self.size
+            return (seq, float(self._stamps[index]), self._frames[index])
+
+class CameraCapture:
+    '''
+    Reads frames from a cv2.VideoCapture source on its own thread,
+    so that a stalling camera driver never blocks the Kivy Clock.
+
+    Frames are decoded straight into a FrameRing. The UI reads the
+    newest frame with latest() whenever it redraws, and on_frame, if
+    given, is called from the capture thread for every new frame as
+    on_frame(seq, timestamp, frame).
+    '''
+    def __init__(self,
+                 source: int|str = 0,
+                 ring_size: int = 4,
+                 on_frame: Callable[[int, float, np.ndarray], None] = None):
+        self.source     = source
+        self.ring       = FrameRing(ring_size)
+        self.on_frame   = on_frame
+        self._stop      = Event()
+        self._thread    = None
+
+    def start(self):
+        if self.is_running():
+            return
+        self._stop.clear()
+        self._thread    = Thread(
+            name        = "FitQuest-camera-capture",
+            target      = self._run,
+            daemon      = True
+        )
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout = timeout)
+            self._thread    = None
+
+    def is_running(self) -> bool:
+        return (self._thread is not None) and self._thread.is_alive()
+
+    def latest(self) -> tuple[int, float, np.ndarray|None]:
+        return self.ring.latest()
+
+    def _run(self):
+        # Opening the device can stall as well, so it happens here.
+        cam_viewer      = cv2.VideoCapture(self.source)
+        try:
+            while not self._stop.is_set():
+                slot            = self.ring.next_slot()
+                if slot is None:
+                    ret_flag, frame = cam_viewer.read()
+                else:
+                    ret_flag, frame = cam_viewer.read(slot)
+
+                if not ret_flag:
+                    if not cam_viewer.isOpened():
+                        print(f"FitQuest >> Unable to read from the camera (source: {self.source})")
+                        return
+                    # Do not spin while the driver has nothing for us.
+                    self._stop.wait(0.005)
+                    continue
+
+                if frame is not slot:
+                    # First frame, or the resolution changed.
+                    slot        = self.ring.next_slot(frame.shape, frame.dtype)
+                    slot[...]   = frame
+
+                timestamp       = monotonic()
+                seq             = self.ring.commit(timestamp)
+                if self.on_frame is not None:
+                    self.on_frame(seq, timestamp, slot)
+        finally:
+            cam_viewer.release()
\ No newline at end of file
@@ -0,0 +1,45 @@
+import numpy as np
+from kivy.graphics.texture import Texture
+from kivy.uix.image import Image
+
+class CameraPreview:
+    '''
+    Shows camera frames on an Image widget through one reusable
+    texture.
+
+    A texture is only created when the frame resolution changes;
+    every other frame is blitted into the existing one straight
+    from the numpy buffer. Camera frames are stored top row first
+    while textures start at the bottom row, and the preview is
+    mirrored for the user, so both flips are done once through the
+    texture coordinates instead of on the pixels.
+    '''
+    def __init__(self, image: Image, colorfmt: str = 'bgr'):
+        self.image      = image
+        self.colorfmt   = colorfmt
+        self._texture   = None
+
+    def _get_texture(self, width: int, height: int) -> Texture:
+        texture             = self._texture
+        if (texture is not None) and (texture.size == (width, height)):
+            return texture
+
+        texture             = Texture.create(size=(width, height), colorfmt=self.colorfmt)
+        texture.flip_vertical()
+        texture.flip_horizontal()
+        self._texture       = texture
+        self.image.texture  = texture
+        return texture
+
+    def update(self, frame: np.ndarray):
+        height, width   = frame.shape[:2]
+        texture         = self._get_texture(width, height)
+
+        # No copy for the C-contiguous frames the capture ring hands out.
+        frame           = np.ascontiguousarray(frame)
+        texture.blit_buffer(frame.data, colorfmt=self.colorfmt, bufferfmt='ubyte')
+        self.image.canvas.ask_update()
+
+    def clear(self):
+        self._texture       = None
+        self.image.texture  = None
\ No newline at end of file
@@ -0,0 +1,53 @@
+'''
+Frame format contract for the live exercise path.
+
+    capture -> BGR, uint8, (height, width, 3), C-contiguous, top row
+               first and not mirrored, exactly as OpenCV decodes it.
+               Frames live in the capture ring buffer (FrameRing).
+
+    preview -> the capture frame itself, blitted with colorfmt 'bgr'.
+               Flipping and mirroring are done by the texture
+               (CameraPreview), so there is no conversion or copy.
+
+    pose    -> RGB, uint8, (height, width, 3), as MediaPipe expects.
+               Produced by exactly one conversion per frame into a
+               buffer that is reused across frames (RGBFrameBuffer).
+               This is also the copy that detaches the frame from
+               the capture ring.
+'''
+import cv2
+import numpy as np
+
+CAPTURE_COLORFMT    = 'bgr'
+POSE_COLORFMT       = 'rgb'
+
+_to_rgb = {
+    3   : cv2.COLOR_BGR2RGB,
+    4   : cv2.COLOR_BGRA2RGB,
+}
+
+class RGBFrameBuffer:
+    '''
+    Converts capture frames to RGB pose input. The returned array
+    is the same buffer every time, reallocated only when the frame
+    resolution changes, so it is only valid until the next call.
+    '''
+    def __init__(self):
+        self._buffer        = None
+        self.allocations    = 0
+
+    def _get_buffer(self, height: int, width: int) -> np.ndarray:
+        buffer              = self._buffer
+        if (buffer is None) or (buffer.shape[:2] != (height, width)):
+            buffer          = np.empty((height, width, 3), dtype=np.uint8)
+            self._buffer    = buffer
+            self.allocations   += 1
+        return buffer
+
+    def convert(self, frame: np.ndarray) -> np.ndarray:
+        if (frame.ndim != 3) or (frame.shape[2] not in _to_rgb):
+            raise ValueError(f"Expected a BGR or BGRA capture frame, got shape {frame.shape}.")
+
+        buffer  = self._get_buffer(*frame.shape[:2])
+        cv2.cvtColor(frame, _to_rgb[frame.shape[2]], dst=buffer)
+        return buffer
\ No newline at end of file
@@ -0,0 +1,73 @@
+from threading import Condition
+
+class FrameMailbox:
+    '''
+    A single-slot, latest-frame-wins handoff between a producer
+    (the camera) and a consumer (the pose detection thread).
+
+    put() never blocks: if the previous frame was not picked up
+    yet, it is dropped and replaced by the new one. get() blocks
+    until a frame is available, the timeout expires, or the
+    mailbox is closed.
+
+    Counters:
+        dropped     - frames overwritten before the consumer got them.
+        processed   - frames handed to the consumer.
+    '''
+    def __init__(self):
+        self._cond      = Condition()
+        self._frame     = None
+        self._closed    = False
+        self.dropped    = 0
+        self.processed  = 0
+
+    def put(self, frame) -> bool:
+        '''
+        Stores frame as the latest frame. Returns False if the
+        mailbox is closed, True otherwise.
+        '''
+        with self._cond:
+            if self._closed:
+                return False
+            if self._frame is not None:
+                self.dropped   += 1
+            self._frame         = frame
+            self._cond.notify()
+        return True
+
+    def get(self, timeout: float = None):
+        '''
+        Waits for and removes the latest frame. Returns None when
+        the timeout expires or the mailbox is closed.
+        '''
+        with self._cond:
+            if not self._cond.wait_for(lambda: (self._frame is not None) or self._closed,
+                                       timeout):
+                return None
+            if self._closed:
+                return None
+
+            frame           = self._frame
+            self._frame     = None
+            self.processed += 1
+            return frame
+
+    def close(self):
+        '''
+        Wakes up any waiting consumer. Frames put afterwards are
+        rejected until reopen() is called.
+        '''
+        with self._cond:
+            self._closed    = True
+            self._frame     = None
+            self._cond.notify_all()
+
+    def reopen(self):
+        with self._cond:
+            self._closed    = False
+            self._frame     = None
+            self.dropped    = 0
+            self.processed  = 0
+
+    def is_closed(self) -> bool:
+        return self._closed
\ No newline at end of file
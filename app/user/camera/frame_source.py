@@ -0,0 +1,45 @@
+import os
+import cv2
+import numpy as np
+from typing import Iterator
+
+IMAGE_EXTENSIONS    = ('.png', '.jpg', '.jpeg', '.bmp')
+
+def iter_frames(path: str, limit: int = None) -> Iterator[np.ndarray]:
+    '''
+    Yields BGR capture frames (see frame_format) from a video file
+    or from a directory of images, read in file name order.
+    Stops after limit frames if given.
+    '''
+    if os.path.isdir(path):
+        frames  = _iter_directory(path)
+    else:
+        frames  = _iter_video(path)
+
+    for i, frame in enumerate(frames):
+        if (limit is not None) and (i >= limit):
+            break
+        yield frame
+
+def _iter_directory(path: str) -> Iterator[np.ndarray]:
+    names   = sorted(name for name in os.listdir(path)
+                     if name.lower().endswith(IMAGE_EXTENSIONS))
+    for name in names:
+        frame   = cv2.imread(os.path.join(path, name), cv2.IMREAD_COLOR)
+        if frame is None:
+            print(f"FitQuest >> Skipping unreadable image {name}")
+            continue
+        yield frame
+
+def _iter_video(path: str) -> Iterator[np.ndarray]:
+    cam_viewer  = cv2.VideoCapture(path)
+    if not cam_viewer.isOpened():
+        raise FileNotFoundError(f"Unable to open the video {path}")
+    try:
+        while True:
+            ret_flag, frame = cam_viewer.read()
+            if not ret_flag:
+                return
+            yield frame
+    finally:
+        cam_viewer.release()
\ No newline at end of file
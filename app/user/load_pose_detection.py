@@ -1,27 +1,41 @@
 from exercise_details import ExerciseDetails
 
 # Pose detection scripts.
-import user.pose_detection.bicep_curl_up
-import user.pose_detection.sit_ups
-import user.pose_detection.squats
-import user.pose_detection.lunges
-import user.pose_detection.high_knees
-import user.pose_detection.push_ups
+from user.pose_detection.bicep_curl_up import BicepCurlUp
+from user.pose_detection.sit_ups import SitUps
+from user.pose_detection.squats import Squats
+from user.pose_detection.lunges import Lunges
+from user.pose_detection.high_knees import HighKnees
+from user.pose_detection.push_ups import PushUps
+from user.pose_detection.rep_machine import get_machine, RepMachineDetector
 
-_check = {
-    'Bicep Curl Up': user.pose_detection.bicep_curl_up.check,
-    'Sit-Ups': user.pose_detection.sit_ups.check,
-    'Squats': user.pose_detection.squats.check,
-    'Lunges': user.pose_detection.lunges.check,
-    'High Knees': user.pose_detection.high_knees.check,
-    'Push Ups': user.pose_detection.push_ups.check
+_detectors = {
+    'Bicep Curl Up': BicepCurlUp,
+    'Sit-Ups': SitUps,
+    'Squats': Squats,
+    'Lunges': Lunges,
+    'High Knees': HighKnees,
+    'Push Ups': PushUps
 }
 
 
 def load(exer_list: list[ExerciseDetails]):
-    global _check
+    '''
+    Gives every exercise in exer_list its own detector instance,
+    so no rep counting state is shared between exercises.
+
+    Exercises without a hand-written detector are counted by a
+    RepMachine compiled from their body parts and angles, if they
+    have them.
+    '''
+    global _detectors
     for exer in exer_list:
-        if not exer.name in _check:
+        if exer.name in _detectors:
+            exer.set_detector(_detectors[exer.name]())
+            continue
+
+        machine = get_machine(exer)
+        if machine is None:
             continue
 
-        exer.check = _check[exer.name]
+        exer.set_detector(RepMachineDetector(machine))
\ No newline at end of file
@@ -0,0 +1,108 @@
+from user.pose_detection.pose_handler import PoseSession
+
+# (model_complexity, input_scale), from the heaviest to the lightest.
+LEVELS  = (
+    (2, 1.0),
+    (1, 1.0),
+    (1, 0.75),
+    (0, 0.75),
+    (0, 0.5),
+)
+
+class AdaptiveInference:
+    '''
+    Picks the pose session's model complexity and input scale from
+    the measured inference latency.
+
+    The budget is the time between camera frames, measured with
+    observe_camera(), unless a fixed budget is given. Latencies
+    passed to observe() are smoothed with an EWMA. If inference falls
+    behind the budget the session steps down to a lighter level; if
+    it stays well inside the budget (below headroom * budget) for a
+    while it steps back up. Each change waits for patience frames, and
+    stepping up waits four times as long, so the level does not
+    oscillate.
+
+    A new model complexity rebuilds the MediaPipe graph on the next
+    frame, so the first warmup latencies after a change are dropped.
+    '''
+    def __init__(self,
+                 session: PoseSession,
+                 budget: float = None,
+                 levels: tuple = LEVELS,
+                 start_level: int = 1,
+                 alpha: float = 0.2,
+                 headroom: float = 0.6,
+                 patience: int = 15,
+                 warmup: int = 2):
+        self.session        = session
+        self.fixed_budget   = budget
+        self.levels         = levels
+        self.alpha          = alpha
+        self.headroom       = headroom
+        self.patience       = patience
+        self.warmup         = warmup
+
+        self.camera_interval    = None
+        self._last_camera       = None
+        self.latency            = None
+        self._frames            = 0
+        self.level              = min(max(start_level, 0), len(levels) - 1)
+        self._apply("start")
+
+    @property
+    def budget(self) -> float|None:
+        if self.fixed_budget is not None:
+            return self.fixed_budget
+        return self.camera_interval
+
+    def observe_camera(self, timestamp: float):
+        '''
+        Records the capture timestamp of a camera frame.
+        '''
+        last                = self._last_camera
+        self._last_camera   = timestamp
+        if (last is None) or (timestamp <= last):
+            return
+        interval            = timestamp - last
+        if self.camera_interval is None:
+            self.camera_interval    = interval
+        else:
+            self.camera_interval   += self.alpha * (interval - self.camera_interval)
+
+    def observe(self, latency: float):
+        '''
+        Records the latency of one processed frame and changes the
+        level if needed.
+        '''
+        if self._skip > 0:
+            self._skip     -= 1
+            return
+
+        if self.latency is None:
+            self.latency    = latency
+        else:
+            self.latency   += self.alpha * (latency - self.latency)
+        self._frames       += 1
+
+        budget  = self.budget
+        if (budget is None) or (self._frames < self.patience):
+            return
+
+        if (self.latency > budget) and (self.level < len(self.levels) - 1):
+            self.level     += 1
+            self._apply(f"latency {self.latency * 1000:.1f} ms over budget {budget * 1000:.1f} ms")
+        elif ((self.latency < budget * self.headroom) and (self.level > 0) and
+              (self._frames >= self.patience * 4)):
+            self.level     -= 1
+            self._apply(f"latency {self.latency * 1000:.1f} ms within budget {budget * 1000:.1f} ms")
+
+    def _apply(self, reason: str):
+        model_complexity, input_scale   = self.levels[self.level]
+        self.session.configure(model_complexity, input_scale)
+        # The new level has to prove itself from scratch.
+        self._frames    = 0
+        self.latency    = None
+        self._skip      = self.warmup
+        print(f"FitQuest >> Pose inference: model_complexity={model_complexity}, "
+              f"input_scale={input_scale} ({reason})")
\ No newline at end of file
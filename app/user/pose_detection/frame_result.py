@@ -0,0 +1,61 @@
+import numpy as np
+from user.pose_detection.return_code import ReturnCode
+
+class FrameResult:
+    '''
+    What a detector made of one frame.
+
+        timestamp   - frame time in seconds (perf_counter)
+        detector    - id of the detector that produced it
+        found       - whether a pose was detected at all
+        ret_code    - ReturnCode.SUCCESS on the frame that completes a rep
+        angle       - the angle that is scored against ideal_angle
+        ideal_angle - the detector's ideal angle
+        angles      - every angle the detector measured, in joints order
+        visibility  - lowest visibility among the measured landmarks
+        stage       - the detector's stage after this frame
+
+    Results come from a FrameResultPool and are overwritten when the
+    pool comes around again, so consumers should read them right away
+    and not keep references.
+    '''
+    __slots__ = ('timestamp', 'detector', 'found', 'ret_code', 'angle', 'ideal_angle',
+                 'angles', 'visibility', 'stage')
+
+    def __init__(self, angle_count: int = 1):
+        self.angles = np.zeros(angle_count, dtype=np.float32)
+        self.clear()
+
+    def clear(self):
+        self.timestamp      = 0.0
+        self.detector       = None
+        self.found          = False
+        self.ret_code       = ReturnCode.FAILURE
+        self.angle          = 0.0
+        self.ideal_angle    = 0.0
+        self.visibility     = 0.0
+        self.stage          = None
+        self.angles.fill(0.0)
+
+    @property
+    def rep(self) -> bool:
+        return self.ret_code == ReturnCode.SUCCESS
+
+    def __repr__(self):
+        return (f"FrameResult(detector={self.detector!r}, found={self.found}, "
+                f"ret_code={self.ret_code}, angle={self.angle:.1f}, stage={self.stage!r})")
+
+class FrameResultPool:
+    '''
+    A fixed ring of FrameResults, handed out in turn and cleared on
+    the way out, so processing a frame allocates no result.
+    '''
+    def __init__(self, angle_count: int = 1, size: int = 4):
+        self._results   = tuple(FrameResult(angle_count) for _ in range(max(size, 1)))
+        self._next      = 0
+
+    def acquire(self) -> FrameResult:
+        result          = self._results[self._next]
+        self._next      = (self._next + 1) % len(self._results)
+        result.clear()
+        return result
\ No newline at end of file
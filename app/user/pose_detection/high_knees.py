@@ -1,42 +1,22 @@
-import cv2
-import mediapipe as mp
-import numpy as np
 from user.pose_detection.pose_handler import *
 from user.pose_detection.return_code import ReturnCode
+from user.pose_detection.joint_angles import angle_table
 
-# Curl counter variables
-stage = None
+class HighKnees(PoseDetector):
+    ideal_angle = 150
+    joints      = angle_table((RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE))
 
-## Setup mediapipe instance
-def check(image):
-    ret_code    = ReturnCode.FAILURE
-    mp_pose     = mp.solutions.pose
-    def on_high_knees(results, ret_code):
-        landmarks = results.pose_landmarks.landmark
-        global stage
-        # Get coordinates
-        hip = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-        knee = [landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].x,landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-        ankle = [landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value].x,landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value].y]
-        
+    def on_pose(self, landmarks, result):
         # Calculate angle
-        angle = calculate_angle(hip, knee, ankle)
-        
-        # Visualize angle
-        # cv2.putText(image, str(angle), 
-        #               tuple(np.multiply(hip, [640, 480]).astype(int)), 
-        #               cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2, cv2.LINE_AA
-        #                    )
-        
+        angle, = self.measure(landmarks, result)
+
         #print(angle)
         # Lunge counter logic
         if angle < 120:
-            stage = "up"
-        if stage =='up' and angle >150:
-            stage="down"
-            ret_code    = ReturnCode.SUCCESS
+            self.stage = "up"
+        if self.stage =='up' and angle >150:
+            self.stage="down"
+            result.ret_code = ReturnCode.SUCCESS
             # print(counter)
-                    
-        return [ret_code, angle]
-        
-    return check_pose(image, ret_code, on_high_knees, 150)
\ No newline at end of file
+
+        result.angle    = angle
\ No newline at end of file
@@ -0,0 +1,39 @@
+import numpy as np
+
+def angle_table(*triplets: tuple[int, int, int]) -> np.ndarray:
+    '''
+    Builds a (K, 3) index table for joint_angles from landmark
+    index triplets (first, vertex, last), e.g.
+        angle_table((RIGHT_HIP, RIGHT_KNEE, RIGHT_ANKLE))
+    '''
+    table   = np.array(triplets, dtype=np.intp).reshape(-1, 3)
+    table.flags.writeable   = False
+    return table
+
+def joint_angles(landmarks: np.ndarray, table: np.ndarray, out: np.ndarray = None) -> np.ndarray:
+    '''
+    Computes the angle in degrees, between 0 and 180, at the vertex
+    of every triplet in table, using the x and y columns of
+    landmarks.
+
+    landmarks is either one frame, shaped (33, F), or a batch of
+    frames, shaped (T, 33, F), with F >= 2. The result is shaped
+    (K,) or (T, K) respectively, for a (K, 3) table.
+
+    This gives the same angles as calculate_angle in pose_handler,
+    for all joints (and frames) in one call.
+    '''
+    # One gather for all joints: (..., K, 3, 2)
+    points      = landmarks[..., table, :2]
+
+    # Vectors from the vertex to the first and last points, and
+    # their directions, all in one arctan2 call: (..., K, 2)
+    arms        = points[..., 0::2, :] - points[..., 1:2, :]
+    heading     = np.arctan2(arms[..., 1], arms[..., 0])
+
+    radians     = heading[..., 1] - heading[..., 0]
+    angle       = np.abs(np.degrees(radians, out=radians), out=out)
+
+    # Fold reflex angles back into [0, 180].
+    np.subtract(360.0, angle, out=angle, where=(angle > 180.0))
+    return angle
\ No newline at end of file
@@ -1,39 +1,318 @@
+import cv2
 import numpy as np
 import mediapipe as mp
+from threading import Lock
+from time import perf_counter
 from typing import Callable
+from user.pose_detection.return_code import ReturnCode
+from user.pose_detection.frame_result import FrameResult, FrameResultPool
+from user.pose_detection.joint_angles import joint_angles
+from user.pose_detection.roi import PersonROI
+from user.pose_detection.smoothing import LandmarkFilter
+
+# Landmark layout, resolved once instead of on every access.
+_PoseLandmark       = mp.solutions.pose.PoseLandmark
+LANDMARK_COUNT      = len(_PoseLandmark)
+LANDMARK_FIELDS     = 4     # x, y, z, visibility
+
+RIGHT_SHOULDER      = _PoseLandmark.RIGHT_SHOULDER.value
+RIGHT_ELBOW         = _PoseLandmark.RIGHT_ELBOW.value
+RIGHT_WRIST         = _PoseLandmark.RIGHT_WRIST.value
+RIGHT_HIP           = _PoseLandmark.RIGHT_HIP.value
+RIGHT_KNEE          = _PoseLandmark.RIGHT_KNEE.value
+RIGHT_ANKLE         = _PoseLandmark.RIGHT_ANKLE.value
+
+# Detectors whose failure has been logged; a detector that fails on
+# every frame is reported once instead of at frame rate.
+_failed_detectors   = set()
 
 def calculate_angle(a,b,c):
+    '''
+    Scalar angle at b, in degrees. Detectors should use
+    joint_angles.joint_angles, which computes all of a frame's
+    angles (or a batch of frames) in one call.
+    '''
     a = np.array(a) # Shoulder
     b = np.array(b) # Hip
     c = np.array(c) # Knees
-    
+
     radians = np.arctan2(c[1]-b[1], c[0]-b[0]) - np.arctan2(a[1]-b[1], a[0]-b[0])
     angle = np.abs(radians*180.0/np.pi)
-    
+
     if angle >180.0:
         angle = 360-angle
-        
+
     return angle
 
-def check_pose(image, ret_code: int, callback: Callable[[None], None], ideal_angle = 90) -> int:
-    '''
-    check_pose expects 1 argument for the callback parameter.
-    '''
-    mp_pose = mp.solutions.pose
-    with mp_pose.Pose(min_detection_confidence=0.5, min_tracking_confidence=0.5) as pose:
-        # Recolor image to RGB
-        image.flags.writeable = False
-        
-        # Make detection
-        results = pose.process(image)
-        image.flags.writeable = True
-        
-        if results.pose_landmarks is None:
-            return [ret_code, 0, ideal_angle]
-        
-        try:
-            ret_code    = callback(results, ret_code)
-        except:
-            pass
-
-    return [*ret_code, ideal_angle]
\ No newline at end of file
+def new_landmark_array() -> np.ndarray:
+    return np.zeros((LANDMARK_COUNT, LANDMARK_FIELDS), dtype=np.float32)
+
+def extract_landmarks(results, out: np.ndarray = None) -> np.ndarray|None:
+    '''
+    Copies results.pose_landmarks into a (33, 4) float32 array of
+    (x, y, z, visibility) rows, indexed by landmark value. Pass the
+    same out array every frame to avoid allocating a new one.
+    Returns None if no pose was found.
+    '''
+    if (results is None) or (results.pose_landmarks is None):
+        return None
+    if out is None:
+        out     = new_landmark_array()
+
+    out[:]      = [(lm.x, lm.y, lm.z, lm.visibility) for lm in results.pose_landmarks.landmark]
+    return out
+
+class PoseSession:
+    '''
+    A long-lived MediaPipe Pose graph.
+
+    Creating mp.solutions.pose.Pose loads the model and builds the
+    graph, so it should happen once per exercise screen visit, not
+    once per frame. Reusing the same graph also lets MediaPipe track
+    the person between frames instead of re-detecting every time.
+
+    The graph is created lazily on the first call to process(), and
+    released with close(). process() and close() are serialized, so
+    the owner may close the session from the UI thread while the
+    image processing thread is still running.
+
+    landmarks is the session's (33, 4) landmark array, refilled by
+    detect() for every frame.
+
+    model_complexity (0, 1 or 2) and input_scale (the fraction of
+    the frame size handed to MediaPipe) can be changed at any time
+    with configure(); see adaptive.AdaptiveInference. Landmarks are
+    normalized, so the scale does not affect the detectors.
+
+    With crop_to_person, detect() only runs inference on the region
+    around the person found in the previous frame (see roi.PersonROI)
+    and maps the landmarks back to full-frame coordinates.
+
+    With smoothing, detect() also runs the landmarks through a One
+    Euro filter (see smoothing.LandmarkFilter, tuned with min_cutoff
+    and beta) before any detector sees them, which keeps the rep
+    thresholds from firing twice on jitter.
+    '''
+    def __init__(self,
+                 min_detection_confidence: float = 0.5,
+                 min_tracking_confidence: float = 0.5,
+                 model_complexity: int = 1,
+                 input_scale: float = 1.0,
+                 crop_to_person: bool = False,
+                 smoothing: bool = False,
+                 min_cutoff: float = 1.5,
+                 beta: float = 10.0):
+        self.min_detection_confidence   = min_detection_confidence
+        self.min_tracking_confidence    = min_tracking_confidence
+        self.model_complexity           = model_complexity
+        self.input_scale                = input_scale
+        self._pose                      = None
+        self._scaled                    = None
+        self._lock                      = Lock()
+        self._closed                    = False
+        self.landmarks                  = new_landmark_array()
+        self.roi                        = PersonROI() if crop_to_person else None
+        self.filter                     = LandmarkFilter(min_cutoff, beta) if smoothing else None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _open(self):
+        self._pose  = mp.solutions.pose.Pose(
+            model_complexity            = self.model_complexity,
+            min_detection_confidence    = self.min_detection_confidence,
+            min_tracking_confidence     = self.min_tracking_confidence
+        )
+
+    def configure(self, model_complexity: int = None, input_scale: float = None):
+        '''
+        Changes the model complexity and/or input scale. A new
+        complexity rebuilds the graph on the next process() call.
+        '''
+        with self._lock:
+            if (model_complexity is not None) and (model_complexity != self.model_complexity):
+                self.model_complexity   = model_complexity
+                if self._pose is not None:
+                    self._pose.close()
+                    self._pose          = None
+
+            if input_scale is not None:
+                self.input_scale        = min(max(input_scale, 0.1), 1.0)
+
+    def _scale(self, image):
+        if self.input_scale >= 1.0:
+            return image
+
+        height, width   = image.shape[:2]
+        size            = (max(int(width * self.input_scale), 1),
+                           max(int(height * self.input_scale), 1))
+        scaled          = self._scaled
+        if (scaled is None) or (scaled.shape[1::-1] != size):
+            scaled      = np.empty((size[1], size[0], image.shape[2]), dtype=image.dtype)
+            self._scaled    = scaled
+        return cv2.resize(image, size, dst=scaled, interpolation=cv2.INTER_AREA)
+
+    def process(self, image):
+        '''
+        Runs pose detection on an RGB image. Returns the MediaPipe
+        results object, or None if the session has been closed.
+        '''
+        with self._lock:
+            if self._closed:
+                return None
+            if self._pose is None:
+                self._open()
+
+            image                   = self._scale(image)
+            # The image may be the reused RGBFrameBuffer; a failed
+            # process() must not leave it read-only for later frames.
+            image.flags.writeable   = False
+            try:
+                return self._pose.process(image)
+            finally:
+                image.flags.writeable   = True
+
+    def detect(self, image, timestamp: float = None) -> np.ndarray|None:
+        '''
+        Runs pose detection on an RGB image and fills the session's
+        landmark array with full-frame normalized landmarks. Returns
+        that array, or None if no pose was found.
+
+        timestamp is the frame time in seconds for the smoothing
+        filter; it defaults to the time of the call.
+        '''
+        box                 = None
+        if self.roi is not None:
+            image, box      = self.roi.crop(image)
+
+        results             = self.process(image)
+        landmarks           = extract_landmarks(results, self.landmarks)
+
+        if self.roi is not None:
+            if (landmarks is not None) and (box is not None):
+                self.roi.to_full_frame(landmarks, box)
+            self.roi.update(landmarks)
+
+        if self.filter is not None:
+            if landmarks is None:
+                self.filter.reset()
+            else:
+                self.filter.apply(landmarks, perf_counter() if timestamp is None else timestamp)
+        return landmarks
+
+    def close(self):
+        with self._lock:
+            self._closed    = True
+            if self._pose is None:
+                return
+            self._pose.close()
+            self._pose      = None
+
+    def is_closed(self) -> bool:
+        return self._closed
+
+def check_pose(image, callback: Callable[[np.ndarray, FrameResult], None], result: FrameResult,
+               session: PoseSession = None) -> FrameResult:
+    '''
+    Runs pose detection on image and, if a pose was found, calls
+    callback(landmarks, result), where landmarks is the session's
+    (33, 4) landmark array for this frame. Returns result.
+
+    If no session is given, a temporary PoseSession is created
+    for this frame only. Callers that process a stream of frames
+    should pass in their own long-lived session instead, or an
+    InferenceScheduler wrapping one.
+    '''
+    if session is None:
+        with PoseSession() as session:
+            return check_pose(image, callback, result, session)
+
+    # Make detection
+    landmarks       = session.detect(image, result.timestamp)
+    if landmarks is None:
+        return result
+
+    result.found    = True
+    try:
+        callback(landmarks, result)
+    except Exception as exc:
+        # A detector bug must not stop the frame loop, but should be seen.
+        result.ret_code = ReturnCode.FAILURE
+        if result.detector not in _failed_detectors:
+            _failed_detectors.add(result.detector)
+            print(f"FitQuest >> {result.detector} failed on a frame: {exc!r} "
+                  f"(further failures are not logged)")
+
+    return result
+
+class PoseDetector:
+    '''
+    Base class for the exercise detectors in user.pose_detection.
+
+    All rep counting state lives on the instance, so every
+    ExerciseDetails gets its own detector (see load_pose_detection)
+    and several detectors can run side by side. Call reset() at set
+    boundaries to start counting from scratch.
+
+    Subclasses set ideal_angle and joints (an angle_table of the
+    triplets they measure), extend reset() with their own state
+    and implement on_pose(landmarks, result). landmarks is a (33, 4)
+    array indexed by the landmark constants in this module, e.g.
+    landmarks[RIGHT_HIP, :2]. on_pose gets its angles from
+    measure(), which also fills result.angles and result.visibility,
+    sets result.angle to the angle it scores and sets result.ret_code
+    to ReturnCode.SUCCESS on the frame that completes a rep.
+
+    check() returns a FrameResult from the detector's own pool; see
+    frame_result.FrameResult.
+
+    infer_every is the smallest number of frames between two pose
+    inferences for this exercise (see scheduler.InferenceScheduler);
+    slow or static exercises can raise it.
+    '''
+    ideal_angle = 90
+    joints      = None
+    infer_every = 1
+
+    def __init__(self):
+        self._results   = FrameResultPool(len(self.joints))
+        self.reset()
+
+    def reset(self):
+        self.stage  = None
+
+    @property
+    def detector_id(self) -> str:
+        return type(self).__name__
+
+    def copy(self):
+        '''
+        Returns a new detector of the same kind with fresh state.
+        '''
+        return type(self)()
+
+    def measure(self, landmarks: np.ndarray, result: FrameResult) -> np.ndarray:
+        '''
+        Computes the angles of joints into result.angles, records
+        how visible their landmarks are, and returns the angles.
+        '''
+        result.visibility   = float(landmarks[self.joints, 3].min())
+        return joint_angles(landmarks, self.joints, result.angles)
+
+    def on_pose(self, landmarks: np.ndarray, result: FrameResult):
+        raise NotImplementedError
+
+    def new_result(self, timestamp: float = None) -> FrameResult:
+        result              = self._results.acquire()
+        result.timestamp    = perf_counter() if timestamp is None else timestamp
+        result.detector     = self.detector_id
+        result.ideal_angle  = self.ideal_angle
+        return result
+
+    def check(self, image, session: PoseSession = None, timestamp: float = None) -> FrameResult:
+        result              = check_pose(image, self.on_pose, self.new_result(timestamp), session)
+        result.stage        = self.stage
+        return result
\ No newline at end of file
@@ -0,0 +1,72 @@
+import numpy as np
+
+# One record per rep. low/high are the extremes of the scored angle
+# during the rep; low is what the curl and sit-up detectors keep as
+# 'inside', the peak of the contraction.
+REP_DTYPE   = np.dtype([
+    ('start',       np.float64),
+    ('end',         np.float64),
+    ('duration',    np.float32),
+    ('low',         np.float32),
+    ('high',        np.float32),
+])
+
+class RepLog:
+    '''
+    The reps of one set, in a structured numpy array that doubles in
+    size when full, so recording a rep is an array write and nothing
+    is written to disk until the set ends (see JSONRepLog).
+
+    Timestamps are in seconds, on the clock of FrameResult.timestamp.
+    '''
+    def __init__(self, capacity: int = 32):
+        self._records   = np.zeros(max(capacity, 1), dtype=REP_DTYPE)
+        self.count      = 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def clear(self):
+        self.count      = 0
+
+    def add(self, start: float, end: float, low: float, high: float):
+        if self.count == len(self._records):
+            grown                   = np.zeros(len(self._records) * 2, dtype=REP_DTYPE)
+            grown[:self.count]      = self._records
+            self._records           = grown
+
+        record              = self._records[self.count]
+        record['start']     = start
+        record['end']       = end
+        record['duration']  = end - start
+        record['low']       = low
+        record['high']      = high
+        self.count         += 1
+
+    @property
+    def records(self) -> np.ndarray:
+        return self._records[:self.count]
+
+    def cadence(self) -> float:
+        '''
+        Reps per minute over the logged reps.
+        '''
+        if self.count == 0:
+            return 0.0
+        records = self.records
+        elapsed = float(records['end'][-1] - records['start'][0])
+        return (self.count * 60.0 / elapsed) if elapsed > 0 else 0.0
+
+    def to_dict(self) -> dict:
+        '''
+        Column lists, with times relative to the start of the first
+        rep, for compact JSON.
+        '''
+        records = self.records
+        origin  = float(records['start'][0]) if self.count else 0.0
+        return {
+            'start'     : np.round(records['start'] - origin, 3).tolist(),
+            'duration'  : np.round(records['duration'].astype(np.float64), 3).tolist(),
+            'low'       : np.round(records['low'].astype(np.float64), 1).tolist(),
+            'high'      : np.round(records['high'].astype(np.float64), 1).tolist(),
+        }
\ No newline at end of file
@@ -0,0 +1,147 @@
+import mediapipe as mp
+from exercise_details import ExerciseDetails
+from user.pose_detection.pose_handler import *
+from user.pose_detection.return_code import ReturnCode
+from user.pose_detection.joint_angles import angle_table
+
+mp_pose = mp.solutions.pose
+
+class RepMachine:
+    '''
+    A rep counter compiled from an exercise's bodypart1..3 and
+    angle1/angle2 fields in exercises.json.
+
+    The three body parts form the joint triplet whose middle joint
+    is measured. angle1 is where a rep starts and angle2 is where it
+    is completed; whether the angle has to rise or fall in between
+    follows from which of the two is larger. For example, Squats
+    (hip, knee, ankle, 90, 160) starts at or below 90 degrees and
+    counts a rep at or above 160, while Bicep Curl Up (shoulder,
+    elbow, wrist, 160, 30) starts at or above 160 and counts at or
+    below 30.
+
+    Machines are immutable and shared; the current stage is kept
+    by the detector that runs them (RepMachineDetector).
+    '''
+    __slots__   = ('name', 'joints', 'table', 'start_angle', 'end_angle', 'rising', 'signature')
+
+    START       = 'start'
+    END         = 'end'
+
+    def __init__(self,
+                 name: str,
+                 joints: tuple[int, int, int],
+                 start_angle: float,
+                 end_angle: float,
+                 signature: tuple = None):
+        self.name           = name
+        self.joints         = joints
+        self.table          = angle_table(joints)
+        self.start_angle    = start_angle
+        self.end_angle      = end_angle
+        self.rising         = end_angle > start_angle
+        self.signature      = signature
+
+    def step(self, stage: str|None, angle: float) -> tuple[str|None, bool]:
+        '''
+        Advances the machine by one angle sample. Returns the new
+        stage and whether a rep was completed on this sample.
+        '''
+        if self.rising:
+            if angle <= self.start_angle:
+                return (RepMachine.START, False)
+            if (stage == RepMachine.START) and (angle >= self.end_angle):
+                return (RepMachine.END, True)
+        else:
+            if angle >= self.start_angle:
+                return (RepMachine.START, False)
+            if (stage == RepMachine.START) and (angle <= self.end_angle):
+                return (RepMachine.END, True)
+        return (stage, False)
+
+def _joint_index(body_part: str) -> int|None:
+    '''
+    Maps a body part name such as "knee", "left knee" or
+    "RIGHT_KNEE" to its MediaPipe landmark index. Names without a
+    side refer to the right side, like the hand-written detectors.
+    '''
+    key     = body_part.strip().upper().replace(' ', '_').replace('-', '_')
+    if not (key.startswith('LEFT_') or key.startswith('RIGHT_')):
+        key = 'RIGHT_' + key
+    try:
+        return mp_pose.PoseLandmark[key].value
+    except KeyError:
+        return None
+
+def compile_machine(exercise: ExerciseDetails) -> RepMachine|None:
+    '''
+    Builds a RepMachine from the exercise's body parts and angles.
+    Returns None if the exercise does not describe a joint triplet
+    and two angles.
+    '''
+    body, angle = exercise.body, exercise.angle
+    if (body is None) or (angle is None) or (len(body) < 3) or (len(angle) < 2):
+        return None
+
+    joints      = tuple(_joint_index(part) for part in body[:3])
+    if None in joints:
+        return None
+
+    try:
+        start_angle, end_angle  = float(angle[0]), float(angle[1])
+    except (TypeError, ValueError):
+        return None
+
+    if start_angle == end_angle:
+        return None
+
+    return RepMachine(exercise.name, joints, start_angle, end_angle,
+                      (tuple(body), tuple(angle)))
+
+# Compiled machines, keyed by exercise name.
+_compiled   = {}
+
+def get_machine(exercise: ExerciseDetails) -> RepMachine|None:
+    '''
+    Returns the cached machine for the exercise, compiling it again
+    only when its body parts or angles were edited since.
+    '''
+    signature   = (tuple(exercise.body or ()), tuple(exercise.angle or ()))
+    machine     = _compiled.get(exercise.name)
+    if (machine is not None) and (machine.signature == signature):
+        return machine
+
+    machine     = compile_machine(exercise)
+    if machine is None:
+        _compiled.pop(exercise.name, None)
+        return None
+
+    _compiled[exercise.name]    = machine
+    return machine
+
+class RepMachineDetector(PoseDetector):
+    '''
+    Runs a RepMachine for exercises that have no hand-written
+    detector.
+    '''
+    def __init__(self, machine: RepMachine):
+        self.machine        = machine
+        self.ideal_angle    = machine.end_angle
+        self.joints         = machine.table
+        super().__init__()
+
+    def copy(self):
+        return RepMachineDetector(self.machine)
+
+    @property
+    def detector_id(self) -> str:
+        return self.machine.name
+
+    def on_pose(self, landmarks, result):
+        angle,      = self.measure(landmarks, result)
+
+        self.stage, rep = self.machine.step(self.stage, angle)
+        if rep:
+            result.ret_code = ReturnCode.SUCCESS
+
+        result.angle    = angle
\ No newline at end of file
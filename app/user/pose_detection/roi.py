@@ -0,0 +1,101 @@
+import numpy as np
+
+class PersonROI:
+    '''
+    Tracks a region of interest around the person from the previous
+    frame's landmarks, so pose inference only has to look at that
+    part of the frame.
+
+    The region is the landmarks' bounding box, padded by padding
+    times its size on every side. It is kept as long as the person
+    stays inside it with margin to spare, which keeps the crop, and
+    therefore MediaPipe's own tracking, stable from frame to frame.
+    When too few landmarks are visible, tracking is considered lost
+    and the next frame is processed in full.
+
+    Boxes are (x0, y0, x1, y1) in normalized full-frame coordinates.
+    '''
+    def __init__(self,
+                 padding: float = 0.25,
+                 margin: float = 0.05,
+                 min_visibility: float = 0.5,
+                 min_landmarks: int = 8,
+                 max_area: float = 0.8):
+        self.padding        = padding
+        self.margin         = margin
+        self.min_visibility = min_visibility
+        self.min_landmarks  = min_landmarks
+        self.max_area       = max_area
+        self.box            = None
+
+    def reset(self):
+        self.box    = None
+
+    def crop(self, image: np.ndarray) -> tuple[np.ndarray, tuple|None]:
+        '''
+        Returns the part of image to run inference on, and the box
+        it covers, or the whole image and None.
+        '''
+        if self.box is None:
+            return (image, None)
+
+        height, width   = image.shape[:2]
+        x0, y0, x1, y1  = self.box
+        left, top       = int(x0 * width), int(y0 * height)
+        right, bottom   = int(np.ceil(x1 * width)), int(np.ceil(y1 * height))
+        if (right - left < 2) or (bottom - top < 2):
+            return (image, None)
+
+        # MediaPipe wants a contiguous image; this copies the crop only.
+        crop            = np.ascontiguousarray(image[top:bottom, left:right])
+        return (crop, (left / width, top / height, right / width, bottom / height))
+
+    def to_full_frame(self, landmarks: np.ndarray, box: tuple):
+        '''
+        Maps landmarks detected in a crop back to full-frame
+        coordinates, in place.
+        '''
+        x0, y0, x1, y1      = box
+        landmarks[:, 0]    *= (x1 - x0)
+        landmarks[:, 0]    += x0
+        landmarks[:, 1]    *= (y1 - y0)
+        landmarks[:, 1]    += y0
+        # z uses roughly the same scale as x.
+        landmarks[:, 2]    *= (x1 - x0)
+
+    def update(self, landmarks: np.ndarray|None):
+        '''
+        Picks the region for the next frame from this frame's
+        full-frame landmarks (None if no pose was found).
+        '''
+        if landmarks is None:
+            self.box    = None
+            return
+
+        visible     = landmarks[:, 3] >= self.min_visibility
+        if np.count_nonzero(visible) < self.min_landmarks:
+            self.box    = None
+            return
+
+        points      = landmarks[visible, :2]
+        x0, y0      = points.min(axis=0)
+        x1, y1      = points.max(axis=0)
+
+        box         = self.box
+        if box is not None:
+            margin  = self.margin
+            if ((x0 - margin >= box[0]) and (y0 - margin >= box[1]) and
+                (x1 + margin <= box[2]) and (y1 + margin <= box[3])):
+                # Still comfortably inside the current region.
+                return
+
+        pad_x       = (x1 - x0) * self.padding
+        pad_y       = (y1 - y0) * self.padding
+        box         = (max(x0 - pad_x, 0.0), max(y0 - pad_y, 0.0),
+                       min(x1 + pad_x, 1.0), min(y1 + pad_y, 1.0))
+
+        if (box[2] - box[0]) * (box[3] - box[1]) > self.max_area:
+            # Cropping would save next to nothing.
+            self.box    = None
+            return
+        self.box    = tuple(float(value) for value in box)
\ No newline at end of file
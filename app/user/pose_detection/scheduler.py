@@ -0,0 +1,113 @@
+import numpy as np
+from user.pose_detection.pose_handler import PoseSession, new_landmark_array
+
+class InferenceScheduler:
+    '''
+    Runs pose inference on every Nth frame only, and fills in the
+    frames in between by extrapolating the landmarks linearly from
+    the last two inferences, so the detectors still get one smooth
+    angle per frame.
+
+    every is the smallest interval, set per exercise from
+    PoseDetector.infer_every. If max_every is larger, the interval
+    follows the motion speed: it grows by one frame while the
+    landmarks move less than slow_motion (normalized units per frame)
+    and drops back to every as soon as they move faster than
+    fast_motion.
+
+    detect() has the same contract as PoseSession.detect, so a
+    scheduler can be passed to check_pose in place of the session.
+    inferences and skipped count the frames of the current set;
+    saved_total keeps counting across sets.
+    '''
+    def __init__(self,
+                 session: PoseSession,
+                 every: int = 1,
+                 max_every: int = None,
+                 slow_motion: float = 0.004,
+                 fast_motion: float = 0.012):
+        self.session        = session
+        self.slow_motion    = slow_motion
+        self.fast_motion    = fast_motion
+        self.landmarks      = new_landmark_array()
+        self._last          = new_landmark_array()
+        self._prev          = new_landmark_array()
+        self.saved_total    = 0
+        self.every          = 1
+        self.max_every      = 1
+        self.reset(every, max_every)
+
+    def reset(self, every: int = None, max_every: int = None):
+        '''
+        Starts a new set, optionally with a new interval.
+        '''
+        if every is not None:
+            self.every      = max(int(every), 1)
+        if max_every is not None:
+            self.max_every  = int(max_every)
+        self.max_every      = max(self.max_every, self.every)
+        self.interval       = self.every
+        self.inferences     = 0
+        self.skipped        = 0
+        self.inferred       = False
+        self._known         = 0     # valid landmark sets in _prev/_last
+        self._since         = 0     # frames since the last inference
+        self._gap           = 1     # frames between the last two inferences
+
+    def detect(self, image, timestamp: float = None) -> np.ndarray|None:
+        if (self._known == 0) or (self._since + 1 >= self.interval):
+            return self._infer(image, timestamp)
+
+        self._since        += 1
+        self.skipped       += 1
+        self.saved_total   += 1
+        self.inferred       = False
+
+        out                 = self.landmarks
+        if self._known < 2:
+            out[:]          = self._last
+            return out
+
+        # out = last + (last - prev) * since / gap, with the
+        # visibility of the last inference.
+        np.subtract(self._last, self._prev, out = out)
+        out                *= self._since / self._gap
+        out                += self._last
+        out[:, 3]           = self._last[:, 3]
+        return out
+
+    def _infer(self, image, timestamp: float) -> np.ndarray|None:
+        self.inferences    += 1
+        self.inferred       = True
+        landmarks           = self.session.detect(image, timestamp)
+        if landmarks is None:
+            # Lost the person: infer every frame until found again.
+            self._known     = 0
+            self.interval   = self.every
+            return None
+
+        self._prev, self._last  = self._last, self._prev
+        self._last[:]           = landmarks
+        self._gap               = self._since + 1
+        self._since             = 0
+        self._known             = min(self._known + 1, 2)
+        if self._known == 2:
+            self._adapt()
+
+        self.landmarks[:]   = landmarks
+        return self.landmarks
+
+    def _adapt(self):
+        if self.max_every <= self.every:
+            return
+
+        visible     = np.minimum(self._last[:, 3], self._prev[:, 3]) >= 0.5
+        if not visible.any():
+            return
+        moved       = self._last[visible, :2] - self._prev[visible, :2]
+        speed       = float(np.sqrt((moved * moved).sum(axis=1)).mean()) / self._gap
+
+        if speed > self.fast_motion:
+            self.interval   = self.every
+        elif (speed < self.slow_motion) and (self.interval < self.max_every):
+            self.interval  += 1
\ No newline at end of file
@@ -0,0 +1,156 @@
+from user.pose_detection.frame_result import FrameResult
+from user.pose_detection.rep_log import RepLog
+
+def process_score(result: FrameResult) -> float:
+    '''
+    Scores a single processed frame. Frames that complete a rep
+    get a bonus of 2.0 on top of their distance to the ideal angle.
+    '''
+    score   = abs(result.angle - result.ideal_angle) / 360.0
+    if result.rep:
+        score   += 2.0
+    return float(score)
+
+class RunningStats:
+    '''
+    Count, mean, variance, min and max of a stream of values in
+    constant space (Welford's algorithm). merge() combines two
+    streams, e.g. the sets of one exercise.
+    '''
+    __slots__ = ('count', 'mean', '_m2', 'min', 'max')
+
+    def __init__(self):
+        self.count  = 0
+        self.mean   = 0.0
+        self._m2    = 0.0
+        self.min    = None
+        self.max    = None
+
+    def add(self, value: float):
+        value       = float(value)
+        self.count += 1
+        delta       = value - self.mean
+        self.mean  += delta / self.count
+        self._m2   += delta * (value - self.mean)
+        if (self.min is None) or (value < self.min):
+            self.min    = value
+        if (self.max is None) or (value > self.max):
+            self.max    = value
+
+    def merge(self, other: 'RunningStats'):
+        if other.count == 0:
+            return
+        if self.count == 0:
+            self.count, self.mean, self._m2     = other.count, other.mean, other._m2
+            self.min, self.max                  = other.min, other.max
+            return
+
+        count       = self.count + other.count
+        delta       = other.mean - self.mean
+        self._m2   += other._m2 + delta * delta * self.count * other.count / count
+        self.mean  += delta * other.count / count
+        self.count  = count
+        self.min    = min(self.min, other.min)
+        self.max    = max(self.max, other.max)
+
+    @property
+    def variance(self) -> float:
+        return (self._m2 / self.count) if self.count > 0 else 0.0
+
+    @property
+    def std(self) -> float:
+        return self.variance ** 0.5
+
+class SetStats:
+    '''
+    Streaming statistics of one set (or, merged, of one exercise):
+
+        score       - RunningStats of process_score over every frame;
+                      score.mean is the value stored as the set's score
+        depth       - RunningStats of each rep's range of motion, the
+                      span of the scored angle between two reps
+        form_error  - EWMA (weight alpha) of the distance to the
+                      ideal angle, as a fraction of a full turn
+        reps        - reps counted
+        rep_log     - optional RepLog that gets a record per rep
+
+    The first rep is timed from the first frame in which the detector's
+    stage changes or the angle moves more than start_motion degrees from
+    where it was first seen, so standing still before the set does not
+    count toward it.
+
+    Apart from rep_log, the state does not grow with the length of
+    the set.
+    '''
+    __slots__ = ('score', 'depth', 'form_error', 'reps', 'rep_log', 'alpha', 'start_motion',
+                 '_low', '_high', '_start', '_rest', '_stage')
+
+    def __init__(self, alpha: float = 0.1, rep_log: RepLog = None, start_motion: float = 10.0):
+        self.score      = RunningStats()
+        self.depth      = RunningStats()
+        self.form_error = None
+        self.reps       = 0
+        self.rep_log    = rep_log
+        self.alpha      = alpha
+        self.start_motion = start_motion
+        self._low       = None
+        self._high      = None
+        self._start     = None
+        self._rest      = None
+        self._stage     = None
+
+    @property
+    def average(self) -> float:
+        return self.score.mean
+
+    def add(self, result: FrameResult) -> float:
+        '''
+        Adds one processed frame and returns its score.
+        '''
+        score       = process_score(result)
+        self.score.add(score)
+        if not result.found:
+            return score
+
+        angle       = float(result.angle)
+        error       = abs(angle - result.ideal_angle) / 360.0
+        if self.form_error is None:
+            self.form_error     = error
+        else:
+            self.form_error    += self.alpha * (error - self.form_error)
+
+        if self._start is None:
+            if self._rest is None:
+                self._rest  = angle
+                self._stage = result.stage
+            if ((result.stage != self._stage) or result.rep
+                  or (abs(angle - self._rest) > self.start_motion)):
+                self._start = result.timestamp
+        if (self._low is None) or (angle < self._low):
+            self._low   = angle
+        if (self._high is None) or (angle > self._high):
+            self._high  = angle
+
+        if result.rep:
+            self.reps  += 1
+            self.depth.add(self._high - self._low)
+            if self.rep_log is not None:
+                self.rep_log.add(self._start, result.timestamp, self._low, self._high)
+            # The next rep starts where this one ended.
+            self._low   = self._high    = angle
+            self._start = result.timestamp
+        return score
+
+    def add_idle(self):
+        '''
+        Counts a frame in which nothing was checked; it scores 0.
+        '''
+        self.score.add(0.0)
+
+    def merge(self, other: 'SetStats'):
+        self.score.merge(other.score)
+        self.depth.merge(other.depth)
+        self.reps      += other.reps
+        # An EWMA follows the most recent frames, i.e. the later set.
+        if other.form_error is not None:
+            self.form_error = other.form_error
\ No newline at end of file
@@ -1,53 +1,36 @@
-import cv2
-import mediapipe as mp
-import numpy as np
 from user.pose_detection.pose_handler import *
 from user.pose_detection.return_code import ReturnCode
+from user.pose_detection.joint_angles import angle_table
 
-# Curl counter variables
-stage       = None
-inside      = 31
-ave         = 0
+class SitUps(PoseDetector):
+    ideal_angle = 30
+    joints      = angle_table((RIGHT_SHOULDER, RIGHT_HIP, RIGHT_KNEE))
 
-## Setup mediapipe instance
-def check(image) -> int:
-    ret_code    = ReturnCode.FAILURE
-    mp_pose     = mp.solutions.pose
-    def on_sit_ups(results, ret_code):
-        global stage, ave, inside
-        landmarks   = results.pose_landmarks.landmark
-        
-        # Get coordinates
-        shoulder    = [landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].x,landmarks[mp_pose.PoseLandmark.RIGHT_SHOULDER.value].y]
-        hip         = [landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].x,landmarks[mp_pose.PoseLandmark.RIGHT_HIP.value].y]
-        knee        = [landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value].x,landmarks[mp_pose.PoseLandmark.RIGHT_KNEE.value].y]
-        
+    def reset(self):
+        # Curl counter variables
+        self.stage      = None
+        self.inside     = 31
+        self.ave        = 0
+
+    def on_pose(self, landmarks, result):
         # Calculate angle
-        angle = calculate_angle(shoulder, hip, knee)
-        
-        # Visualize angle
-        cv2.putText(image, str(angle), 
-                    tuple(np.multiply(hip, [640, 480]).astype(int)), 
-                    cv2.FONT_HERSHEY_SIMPLEX, 0.5, (255, 255, 255), 2, cv2.LINE_AA
-                            )
-        
+        angle,      = self.measure(landmarks, result)
+
         #print(angle)
         # Curl counter logic
         if angle > 120:
-            stage       = "down"
+            self.stage      = "down"
 
-        if angle < 30 and stage =='down':
-            stage       = "up"
-            if inside > angle:
-                inside  = angle
-            ret_code    = ReturnCode.SUCCESS
+        if angle < 30 and self.stage =='down':
+            self.stage      = "up"
+            if self.inside > angle:
+                self.inside = angle
+            result.ret_code = ReturnCode.SUCCESS
 
-        if angle > 30 and stage == 'up':
-            ave += inside
-            inside      = 31
-            stage       = "down"
-            print(ave)   
+        if angle > 30 and self.stage == 'up':
+            self.ave       += self.inside
+            self.inside     = 31
+            self.stage      = "down"
+            # print(self.ave)
 
-        return [ret_code, angle]
-    
-    return check_pose(image, ret_code, on_sit_ups, 30)
\ No newline at end of file
+        result.angle    = angle
\ No newline at end of file
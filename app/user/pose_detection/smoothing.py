@@ -0,0 +1,88 @@
+import numpy as np
+
+class LandmarkFilter:
+    '''
+    One Euro filter over the x, y and z of every landmark, applied to
+    the whole (N, 4) landmark array at once.
+
+    Each coordinate is low-pass filtered with a cutoff that rises
+    with its speed: min_cutoff (Hz) sets how much jitter is removed
+    while a joint is still, beta how quickly the filter lets go when
+    it moves, so a held pose is steady and a fast rep is not lagged.
+    Speeds are in normalized frame units per second, filtered with
+    d_cutoff.
+
+    All state lives in fixed arrays, sized on the first frame;
+    filtering a frame allocates nothing after that. Visibility is
+    passed through unfiltered.
+    '''
+    def __init__(self,
+                 min_cutoff: float = 1.5,
+                 beta: float = 10.0,
+                 d_cutoff: float = 1.0):
+        self.min_cutoff = min_cutoff
+        self.beta       = beta
+        self.d_cutoff   = d_cutoff
+        self._x         = None
+        self._last_time = None
+
+    def _allocate(self, shape: tuple):
+        self._x         = np.zeros(shape, dtype=np.float32)
+        self._dx        = np.zeros(shape, dtype=np.float32)
+        self._raw_dx    = np.zeros(shape, dtype=np.float32)
+        self._alpha     = np.zeros(shape, dtype=np.float32)
+
+    def reset(self):
+        '''
+        Forgets the previous frames, e.g. after tracking was lost.
+        '''
+        self._last_time = None
+
+    @staticmethod
+    def _smoothing(cutoff, dt: float):
+        # alpha = 1 / (1 + tau / dt), with tau = 1 / (2 pi cutoff)
+        return 1.0 / (1.0 + 1.0 / (2.0 * np.pi * cutoff * dt))
+
+    def apply(self, landmarks: np.ndarray, timestamp: float) -> np.ndarray:
+        '''
+        Filters landmarks (N, 4) in place, given the frame time in
+        seconds, and returns them.
+        '''
+        coords          = landmarks[:, :3]
+        last_time       = self._last_time
+        self._last_time = timestamp
+        if (self._x is None) or (self._x.shape != coords.shape):
+            self._allocate(coords.shape)
+            last_time   = None
+
+        if (last_time is None) or (timestamp <= last_time):
+            self._x[:]  = coords
+            self._dx.fill(0.0)
+            return landmarks
+
+        dt              = timestamp - last_time
+        raw_dx          = self._raw_dx
+        alpha           = self._alpha
+
+        # Filtered speed of every coordinate.
+        np.subtract(coords, self._x, out = raw_dx)
+        raw_dx         /= dt
+        raw_dx         -= self._dx
+        raw_dx         *= self._smoothing(self.d_cutoff, dt)
+        self._dx       += raw_dx
+
+        # Speed dependent cutoff, then the smoothing factor for it.
+        np.abs(self._dx, out = alpha)
+        alpha          *= self.beta
+        alpha          += self.min_cutoff
+        alpha          *= 2.0 * np.pi * dt
+        np.reciprocal(alpha, out = alpha)
+        alpha          += 1.0
+        np.reciprocal(alpha, out = alpha)
+
+        # x = x_prev + alpha * (raw - x_prev)
+        np.subtract(coords, self._x, out = raw_dx)
+        raw_dx         *= alpha
+        self._x        += raw_dx
+        coords[:]       = self._x
+        return landmarks
\ No newline at end of file
@@ -18,6 +18,19 @@ back_button_params  = {
     'pos_hint'      : {'x': 0.05, 'center_y': 0.12},
 }
 countdown_time      = 3
+# Let the pose session trade model complexity and input resolution
+# for speed when inference cannot keep up with the camera.
+adaptive_inference  = True
+# Run pose inference only on the area around the person once found.
+roi_cropping        = True
+# Upper bound on the frames between two pose inferences while the
+# user moves slowly; skipped frames are extrapolated.
+max_infer_every     = 3
+# One Euro smoothing of the landmarks before the rep logic. A lower
+# cutoff removes more jitter, a higher beta follows fast moves sooner.
+landmark_smoothing  = True
+smoothing_cutoff    = 1.5
+smoothing_beta      = 10.0
 
 user_reps_count     = 12
 user_reps_mult      = 5
@@ -14,7 +14,7 @@ from kivy.metrics import dp
 
 import user.user_config as user_config
 import admin.app_config as admin_config
-import admin.json_handler as json_handler
+import admin.storage as storage
 from admin.admin_widgets import *
 from user.user_widgets import *
 from exercise_details import ExerciseDetails
@@ -191,7 +191,7 @@ class CustomRoutineScreen(Screen):
         # =======================================
         #       Create Button Options
         # =======================================
-        json_exer = json_handler.JSONExercise()
+        json_exer = storage.Exercise()
         exer_list = json_exer.extract_list()
 
         for exercise in exer_list:
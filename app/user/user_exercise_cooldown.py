@@ -15,6 +15,8 @@ from admin.admin_widgets import *
 from user.user_widgets import *
 from exercise_details import ExerciseDetails
 from routine_details import RoutineDetails
+from user_details import star_rating
+from user.pose_detection.scoring import SetStats
 from math import ceil
 
 class CooldownScreen(Screen):
@@ -24,18 +26,8 @@ class CooldownScreen(Screen):
     duration    = BoundedNumericProperty(0, min=0)
 
     def get_star_rating(self, score: float):
-        if score > 1:
-            score   = 1.0
-        elif score < 0:
-            score   = 0
-
-        # Since this is a list with six items, a simple
-        # linear search will work.
-        for i in range(len(self._score)):
-            if score < self._score[i]:
-                return i
-        
-        return len(self._score)
+        score   = min(max(score, 0.0), 1.0)
+        return star_rating(score, self._score)
 
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -133,7 +125,8 @@ class CooldownScreen(Screen):
         # Compute average
         exer_average                = self.exer_average
         exercise: ExerciseDetails   = exer_average['exercise'][-1]           
-        average_score               = exer_average['average'][-1]
+        set_stats: SetStats         = exer_average['stats'][-1]
+        average_score               = set_stats.average
         star_count                  = self.get_star_rating(average_score)
         star_count                  = 0 if star_count < 0 else star_count
         self.remark_label.text      = user_config.cooldown_ratings[star_count]
@@ -11,11 +11,12 @@ import user.user_config as user_config
 from user.user_widgets import *
 
 import admin.app_config as admin_config
-import admin.json_handler as json_handler
+import admin.storage as storage
 
 from admin.admin_widgets import *
-from user_details import UserDetails
+from user_details import UserDetails, ScoreAggregate
 from exercise_details import ExerciseDetails
+from user.pose_detection.scoring import SetStats
 # from routine_details import RoutineDetails
 
 from admin.admin_behavior import BackButtonDispatch
@@ -119,18 +120,20 @@ class SummaryScreen(Screen):
             raise RuntimeError("No user specified! This screen should be unreachable!")
         
         exer_list                       = self.exer_average['exercise']
-        avg_list                        = self.exer_average['average']
-        json_user                       = json_handler.JSONUser()
+        stats_list                      = self.exer_average['stats']
+        # This session's sets per exercise, kept past reset_average().
+        totals                          = dict(self.exer_average['totals'])
+        json_user                       = storage.User()
         for i in range(len(exer_list)):
             exercise: ExerciseDetails   = exer_list[i]
-            avg_score: float            = avg_list[i]
-            user.add_exercise(exercise, avg_score)
+            set_stats: SetStats         = stats_list[i]
+            user.add_exercise(exercise, set_stats.average)
 
         self.exer_screen.reset_average()
         json_user.update()
         
         user_exer_list                  = user.get_exercise_list()
-        json_object                     = json_handler.JSONExercise()
+        json_object                     = storage.Exercise()
         for exer_dict in user_exer_list:
             # Display exercise list
             # TO-DO: Render this part.
@@ -166,21 +169,25 @@ class SummaryScreen(Screen):
                 spacing     = [10, 0],
             )
             inner_layout.add_widget(inner_grid)
+
+            exer_totals: SetStats   = totals.get(exer_dict['name'])
+            if exer_totals is not None:
+                inner_label     = Label(
+                    size_hint   = [1.0, 0.12],
+                    pos_hint    = {'center_x': 0.5, 'y': 0.22},
+                    text        = (f"{exer_totals.reps} reps, "
+                                   f"score {exer_totals.average:.2f}"),
+                    color       = [0.2, 0.2, 0.2, 1],
+                    halign      = 'center',
+                    valign      = 'center'
+                )
+                inner_label.bind(size = inner_label.setter('text_size'))
+                inner_layout.add_widget(inner_label)
             
-            # Calculate the average score for this particular exercise.
-            average         = 0.0
-            for value in exer_dict['score']:
-                average    += value
-
-            if len(exer_dict['score']) == 0:
-                average     = 0.0
-            else:
-                average    /= len(exer_dict['score'])
-
-            # Map the average score to the appropriate rating
-            stars_obtained  = int(average / 0.2)
-            stars_obtained  = 5 if stars_obtained >= 5 else stars_obtained
-            stars_obtained  = 0 if stars_obtained <= 0 else stars_obtained
+            # The rating of the average score, kept up to date as
+            # scores are added.
+            stats: ScoreAggregate   = exer_dict['stats']
+            stars_obtained  = stats.stars
 
             # Change the color property of the Image widgets.
             for i in range(5):
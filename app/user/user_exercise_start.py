@@ -10,12 +10,22 @@ from kivy.uix.camera import Camera
 from kivy.uix.widget import Widget
 from kivy.clock import Clock
 from kivy.metrics import dp
-from threading import Thread
+from threading import Thread, current_thread
+from time import perf_counter
 
 from kivy.graphics import Color, RoundedRectangle
 from kivy.graphics.texture import Texture
 from typing import Callable
 from user.pose_detection.return_code import ReturnCode
+from user.pose_detection.pose_handler import PoseSession
+from user.pose_detection.scoring import SetStats
+from user.pose_detection.rep_log import RepLog
+from user.pose_detection.adaptive import AdaptiveInference
+from user.pose_detection.scheduler import InferenceScheduler
+from user.camera.frame_mailbox import FrameMailbox
+from user.camera.camera_capture import CameraCapture
+from user.camera.camera_preview import CameraPreview
+from user.camera.frame_format import RGBFrameBuffer, CAPTURE_COLORFMT
 from kivy.uix.modalview import ModalView
 from admin.admin_behavior import BackButtonDispatch
 
@@ -51,14 +61,19 @@ class ExerciseScreen(Screen):
     exercise    = StringProperty("", allownone=False)
 
     def reset_average(self):
+        # 'stats' holds each set's SetStats, in step with 'exercise',
+        # for the cooldown screen; 'totals' merges the sets of every
+        # exercise by name, for the summary screen.
         if not hasattr(self, 'exer_average'):
             self.exer_average   = {
                 'exercise'      : [],
-                'average'       : [],
+                'stats'         : [],
+                'totals'        : {},
             }
         else:
             self.exer_average['exercise'].clear()
-            self.exer_average['average'].clear()
+            self.exer_average['stats'].clear()
+            self.exer_average['totals'].clear()
     
     def __new__(cls, *args, **kwargs):
         if cls._instance is None:
@@ -79,6 +94,14 @@ class ExerciseScreen(Screen):
         layout.add_widget(bg)
         self._layout        = layout
         self._active        = False
+        self.set_stats      = SetStats()
+        self.pose_session   = None
+        self.adaptive       = None
+        self.scheduler      = None
+        self.frame_mailbox  = FrameMailbox()
+        self.capture        = None
+        self._preview_seq   = -1
+        self.pose_input     = RGBFrameBuffer()
 
         # ===============================
         #        Instructions widget
@@ -144,6 +167,7 @@ class ExerciseScreen(Screen):
             pos_hint                    = {'center_x': 0.45, 'center_y': 0.5},
         )
         self.camera                     = camera
+        self.preview                    = CameraPreview(camera, CAPTURE_COLORFMT)
         layout.add_widget(camera)
 
         # ===============================
@@ -235,13 +259,6 @@ class ExerciseScreen(Screen):
         back_btn.bind(on_press=self.show_exit_confirmation)
         BackButtonDispatch.on_release(back_btn, 'user_routine_selection', self._sm, 'right')
 
-    # Handle the scoring process here
-    def process_score(self, ret_code, angle, ideal_angle):
-        score   = abs(angle - ideal_angle) / 360.0
-        if ret_code == ReturnCode.SUCCESS:
-            score   += 2.0
-        return score
-
     def on_camera_update(self, tick):
         while True:
             if (not hasattr(self, '_loaded')) or (not self._loaded):
@@ -258,27 +275,22 @@ class ExerciseScreen(Screen):
             # self.duration              -= tick
             break
 
-        ret_flag, frame                 = self.cam_viewer.read()
-        if not ret_flag:
+        # Only redraw when the capture thread has a new frame.
+        seq, timestamp, frame           = self.capture.latest()
+        if (frame is None) or (seq == self._preview_seq):
             return
+        self._preview_seq               = seq
 
         # Update camera feed.
-        # Convert the frame to a format suitable for displaying in Kivy
-        frame                           = cv2.flip(cv2.flip(frame, 0), 1)
-        buffer                          = frame.tostring()
-        texture1                        = Texture.create(size=(frame.shape[1], frame.shape[0]), colorfmt='bgr')
-        texture1.blit_buffer(buffer, colorfmt='bgr', bufferfmt='ubyte')
-
-        # Update the Image widget with the new frame
-        self.camera.texture             = texture1
+        # The preview reuses its texture and flips it through the
+        # texture coordinates, so the frame is blitted as is.
+        self.preview.update(frame)
 
-        cv_texture                      = cv2.cvtColor(frame, cv2.COLOR_RGBA2BGR)
         exercise                        = self.active_exercise
-        self._cv_texture                = cv_texture
         if ((exercise is None) or (exercise.check is None)):
-            self.run_instances         += 1
+            self.set_stats.add_idle()
             return
-        
+
         # try:
         #     # cur_exercise.check is defined
         #     ret_code            = exercise.check(cv_texture)
@@ -291,13 +303,29 @@ class ExerciseScreen(Screen):
         # except:
         #     pass
 
+    def on_capture_frame(self, seq: int, timestamp: float, frame):
+        '''
+        Called from the capture thread for every new frame.
+        '''
+        if self.adaptive is not None:
+            self.adaptive.observe_camera(timestamp)
+
+        exercise    = self.active_exercise
+        if ((exercise is None) or (exercise.check is None)):
+            return
+
+        # Hand the frame over to the image processing thread.
+        # This never blocks; an unprocessed older frame is dropped.
+        self.frame_mailbox.put(frame)
+
     def inc_count(self, *args):
         self.count  += 1
 
     def request_process_feed(self):
         if not self._active:
             return
-        
+
+        self.frame_mailbox.reopen()
         self.img_proc_thread    = Thread(
             name                = "FitQuest-img-process",
             target              = self.process_feed,
@@ -306,29 +334,39 @@ class ExerciseScreen(Screen):
         self.img_proc_thread.start()
 
     def process_feed(self):
-        while self._active:
-            if not hasattr(self, '_cv_texture'):
+        mailbox                 = self.frame_mailbox
+        # A newer thread replaces this one when processing is resumed.
+        while self._active and (getattr(self, 'img_proc_thread', None) is current_thread()):
+            # Sleep until the capture thread posts a new frame.
+            frame               = mailbox.get(timeout = 0.5)
+            if frame is None:
                 continue
-        
+
             exercise            = self.active_exercise
-            cv_texture          = self._cv_texture
-            self._cv_texture    = None
-            del self._cv_texture
+            if ((exercise is None) or (exercise.check is None)):
+                continue
 
             try:
+                # frame is a BGR view into the capture ring buffer. The
+                # one RGB conversion also detaches it from the ring.
+                cv_texture          = self.pose_input.convert(frame)
+
                 # cur_exercise.check is defined
-                ret_code            = exercise.check(cv_texture)
+                start               = perf_counter()
+                result              = exercise.check(cv_texture, self.scheduler)
+                if (self.adaptive is not None) and self.scheduler.inferred:
+                    self.adaptive.observe(perf_counter() - start)
 
-                self.run_average   += self.process_score(*ret_code)
-                self.run_instances += 1
+                self.set_stats.add(result)
 
-                if ret_code[0] == ReturnCode.SUCCESS:
+                if result.rep:
                     Clock.schedule_once(
                         self.inc_count,
                         0
                     )
-            except:
-                pass
+            except Exception as exc:
+                # Keep the loop alive; the next frame may well succeed.
+                print(f"FitQuest >> Frame processing failed: {exc!r}")
 
     def load_exercise(self, deduct: bool = True) -> ExerciseDetails:
         rout_list   = self._app.post_routine()
@@ -354,10 +392,25 @@ class ExerciseScreen(Screen):
         self._active            = True
         self._loaded            = False
 
-        self.run_average        = 0.0
-        self.run_instances      = 0
-
-        self.cam_viewer         = cv2.VideoCapture(0)
+        self.set_stats          = SetStats(rep_log = RepLog())
+
+        # The pose session lives until on_pre_leave, so the model
+        # is loaded once instead of once per frame.
+        if self.pose_session is None:
+            self.pose_session   = PoseSession(crop_to_person = user_config.roi_cropping,
+                                              smoothing = user_config.landmark_smoothing,
+                                              min_cutoff = user_config.smoothing_cutoff,
+                                              beta = user_config.smoothing_beta)
+            if user_config.adaptive_inference:
+                # Start the next set where the previous one settled.
+                level           = 1 if (self.adaptive is None) else self.adaptive.level
+                self.adaptive   = AdaptiveInference(self.pose_session, start_level = level)
+            self.scheduler      = InferenceScheduler(self.pose_session,
+                                                     max_every = user_config.max_infer_every)
+
+        self._preview_seq       = -1
+        self.capture            = CameraCapture(0, on_frame = self.on_capture_frame)
+        self.capture.start()
         self.cam_monitor        = Clock.schedule_interval(
             self.on_camera_update,
             self.tick_rate,
@@ -370,6 +423,13 @@ class ExerciseScreen(Screen):
         if exercise is None:
             return
 
+        # Every set starts counting from scratch.
+        if exercise.detector is not None:
+            exercise.detector.reset()
+            self.scheduler.reset(every = exercise.detector.infer_every)
+        else:
+            self.scheduler.reset(every = 1)
+
         self.reps               = exercise.reps
         self.count              = 0
         self.exercise           = exercise.name
@@ -379,15 +439,28 @@ class ExerciseScreen(Screen):
         self._loaded            = False
 
     def on_pre_leave(self):
-        self.cam_viewer.release()
-        self.cam_viewer     = None
-        del self.cam_viewer
+        # Stop the image processing thread before tearing down
+        # the pose session it is using.
+        self._active        = False
+        self.frame_mailbox.close()
+        if hasattr(self, 'img_proc_thread'):
+            self.img_proc_thread.join(timeout = 1.0)
+            del self.img_proc_thread
+
+        if self.pose_session is not None:
+            self.pose_session.close()
+            self.pose_session   = None
+            print(f"FitQuest >> Pose inference skipped on {self.scheduler.saved_total} frames")
+            self.scheduler      = None
+
+        self.capture.stop()
+        self.capture        = None
 
         self.cam_monitor.cancel()
         del self.cam_monitor
 
-        self.run_average        = 0.0
-        self.run_instances      = 0
+        # The finished set's stats stay in exer_average.
+        self.set_stats          = SetStats()
 
     def on_count(self, instance, value):
         self.count_label.text   = str(value)
@@ -410,11 +483,15 @@ class ExerciseScreen(Screen):
     def to_next_screen(self):
         self._active            = False
 
-        self.exer_average['exercise'].append(self.active_exercise)
-        try:
-            self.exer_average['average'].append(self.run_average / self.run_instances)
-        except ZeroDivisionError:
-            self.exer_average['average'].append(0.0)
+        exercise                = self.active_exercise
+        set_stats               = self.set_stats
+        self.exer_average['exercise'].append(exercise)
+        self.exer_average['stats'].append(set_stats)
+        totals                  = self.exer_average['totals']
+        if exercise.name not in totals:
+            totals[exercise.name]   = SetStats()
+        totals[exercise.name].merge(set_stats)
+        self.save_rep_log(exercise, set_stats.rep_log)
 
         self.active_exercise    = None
         self._sm.transition     = FadeTransition(duration=0.5)
@@ -423,9 +500,17 @@ class ExerciseScreen(Screen):
         self._sm.transition     = FadeTransition(duration=0.5)
         self._sm.current        = 'exercise_cooldown'
 
+    def save_rep_log(self, exercise: ExerciseDetails, rep_log: RepLog):
+        # Queued once per set; the persistence worker writes it.
+        user    = self._app.user.get_choice()
+        if (user is None) or (rep_log is None):
+            return
+        json_handler.JSONRepLog().append(user.username, exercise, rep_log)
+
     def show_exit_confirmation(self, instance):
         # Pause camera updates and processing
         self._active = False
+        self.frame_mailbox.close()
         self.cam_monitor.cancel()
         del self.cam_monitor
 
@@ -461,6 +546,7 @@ class ExerciseScreen(Screen):
            # Resume camera updates and processing
             self._active        = True
             self.cam_monitor    = Clock.schedule_interval(self.on_camera_update, self.tick_rate)
+            self.request_process_feed()
             self.exit_confirmation_popup = None  # Reset the reference to None
 
     def redirect_to_routine_selection(self):
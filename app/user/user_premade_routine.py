@@ -14,7 +14,7 @@ from kivy.metrics import dp
 
 import user.user_config as user_config
 import admin.app_config as admin_config
-import admin.json_handler as json_handler
+import admin.storage as storage
 from admin.admin_widgets import *
 from user.user_widgets import *
 from exercise_details import ExerciseDetails
@@ -119,7 +119,7 @@ class PremadeRoutineScreen(Screen):
 
         def on_routine_proceed():
             self._choice['finalized'] = True
-            json_routine    = json_handler.JSONRoutine()
+            json_routine    = storage.Routine()
             json_list       = json_routine.extract_list()
             self._app.send_routine(json_list[self._choice['option']].copy())
 
@@ -168,7 +168,7 @@ class PremadeRoutineScreen(Screen):
         # =======================================
         #           Add Routines
         # =======================================
-        json_routine        = json_handler.JSONRoutine()
+        json_routine        = storage.Routine()
         rout_list           = json_routine.extract_list()
         valid_rout_counter  = 0
 
@@ -9,7 +9,7 @@ from kivy.metrics import dp
 import user.user_config as user_config
 import admin.app_config as admin_config
 from admin.admin_widgets import *
-from admin.json_handler import JSONUser
+from admin.storage import User
 from user_details import UserDetails
 from user.user_widgets import KivyPropHandler
 
@@ -38,7 +38,7 @@ class UserScreen(Screen):
             cls._instance   = super(UserScreen, cls).__new__(cls, **kwargs)
         return cls._instance
 
-    def __init__(self, sm: ScreenManager, user_handler: JSONUser, **kwargs):
+    def __init__(self, sm: ScreenManager, user_handler: User, **kwargs):
         super().__init__(**kwargs)
         self._sm            = sm
         self.user_handler   = user_handler
@@ -1,47 +1,143 @@
+from bisect import bisect_right
+from typing import Callable, Sequence
+import numpy as np
 from exercise_details import ExerciseDetails
 
+# Lower bounds of the 1 to 5 star ratings of an average score.
+STAR_THRESHOLDS = (0.2, 0.4, 0.6, 0.8, 1.0)
+
+def star_rating(score: float, thresholds: Sequence[float] = STAR_THRESHOLDS) -> int:
+    '''
+    Returns the number of thresholds the score reaches, i.e. 0 up to
+    len(thresholds) stars. thresholds must be sorted.
+    '''
+    return bisect_right(thresholds, score)
+
+class ScoreAggregate:
+    '''
+    Running aggregates of one exercise's score history: the count,
+    the sum, the last recent_size scores and the star rating of the
+    average. add() updates them with new scores in O(new scores);
+    rebuild() recomputes them from a whole history at once.
+    '''
+    __slots__   = ('count', 'total', 'recent', 'stars')
+    recent_size = 10
+
+    def __init__(self, scores: np.ndarray = None):
+        self.rebuild(np.zeros(0, np.float32) if scores is None else scores)
+
+    def rebuild(self, scores: np.ndarray):
+        self.count  = 0
+        self.total  = 0.0
+        self.recent = np.zeros(0, np.float32)
+        self.add(scores)
+
+    def add(self, scores: np.ndarray):
+        self.count += len(scores)
+        self.total += float(np.sum(scores, dtype = np.float64))
+        self.recent = np.concatenate((self.recent, scores[-self.recent_size:]))[-self.recent_size:]
+        self.stars  = star_rating(self.average)
+
+    @property
+    def average(self) -> float:
+        return (self.total / self.count) if self.count > 0 else 0.0
+
 class UserDetails:
+    '''
+    A user and their score history per exercise.
+
+    If a loader is given, the score history is not loaded until it
+    is first used: loader(user) then fills it in with add_exercise.
+    unload() drops it again, to be reloaded on the next use.
+    '''
     def __init__(self,
-                 name: str):
+                 name: str,
+                 loader: Callable[['UserDetails'], None] = None):
         self.username   = name
-        self.exercises  = []
+        self._loader    = loader
+        self._exercises = None
+        # exercises by name, kept in step with self.exercises.
+        self._exercise_index    = None
+        # Per exercise name, the array that 'score' is a view of, with
+        # room to append.
+        self._score_buffers     = None
+        if loader is None:
+            self._exercises         = []
+            self._exercise_index    = {}
+            self._score_buffers     = {}
+
+    @property
+    def exercises(self) -> list[dict]:
+        self._load()
+        return self._exercises
+
+    @property
+    def loaded(self) -> bool:
+        return self._exercises is not None
+
+    def _load(self):
+        if self._exercises is not None:
+            return
+        self._exercises         = []
+        self._exercise_index    = {}
+        self._score_buffers     = {}
+        self._loader(self)
+
+    def unload(self):
+        '''
+        Drops the score history of a lazily loaded user.
+        '''
+        if self._loader is None:
+            return
+        self._exercises         = None
+        self._exercise_index    = None
+        self._score_buffers     = None
 
     def add_exercise(self,
                      exercise: ExerciseDetails,
-                     avg_list: list[float] | float):
+                     avg_list: list[float] | np.ndarray | float):
         '''
         Adds an exercise to the user's list of performed
         exercises, and updates the score history of the
         specified exercise.
         '''
-        _index  = -1
-        # Due to recursive imports, we can't use
-        # JSONExercise().get_exercise(exercise.name)
-        for i in range(len(self.exercises)):
-            iter_exercise   = self.exercises[i]
-            if iter_exercise['name'] == exercise.name:
-                _index      = i
-                break
-
-        if _index > -1:
-            # Found a result.
-            iter_dict       = self.exercises[_index]
-            iter_list       = iter_dict['score']
-            if isinstance(avg_list, float):
-                iter_list.append(avg_list)
-            else:
-                for score in avg_list:
-                    iter_list.append(score)
+        self._load()
+        # Not copied: a loaded history stays a view of the score store
+        # until scores are appended to it.
+        scores              = np.asarray(avg_list, dtype = np.float32).reshape(-1)
+        iter_dict           = self._exercise_index.get(exercise.name)
+        if iter_dict is not None:
+            # Found a result. Appending copies the history only when
+            # the buffer is full, doubling it.
+            buffer          = self._score_buffers[exercise.name]
+            count           = len(iter_dict['score'])
+            needed          = count + len(scores)
+            if needed > len(buffer):
+                grown           = np.empty(max(needed, 2 * len(buffer)), dtype = np.float32)
+                grown[:count]   = buffer[:count]
+                buffer          = grown
+                self._score_buffers[exercise.name]  = buffer
+            buffer[count:needed]    = scores
+            iter_dict['score']  = buffer[:needed]
+            iter_dict['stats'].add(scores)
             return
 
+        self._score_buffers[exercise.name]  = scores
         iter_dict           = {
             'name'          : exercise.name,
+            'score'         : scores,
+            'stats'         : ScoreAggregate(scores),
         }
-        if isinstance(avg_list, float):
-            iter_dict['score']  = [avg_list]
-        else:
-            iter_dict['score']  = avg_list[:]
-        self.exercises.append(iter_dict)
+        self._exercises.append(iter_dict)
+        self._exercise_index[exercise.name] = iter_dict
+
+    def get_exercise(self, exer_name: str) -> dict|None:
+        '''
+        Returns the score history dictionary of the given exercise,
+        or None if the user has not performed it yet.
+        '''
+        self._load()
+        return self._exercise_index.get(exer_name)
 
     def get_exercise_list(self) -> list[dict[str, str]]:
         '''
@@ -52,7 +148,11 @@ class UserDetails:
         Dictionary object fields:
             'name'  : str   - used to point towards the relevant ExerciseDetails
 
-            'score' : []    - stores all previously registered average scores.
+            'score' : np.ndarray    - stores all previously registered average
+                                      scores, as float32. Do not write to
+                                      it: it may be memory-mapped.
+
+            'stats' : ScoreAggregate - running aggregates of 'score'.
         '''
         ret_list    = []
         for exer_dict in self.exercises:
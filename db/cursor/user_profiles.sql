@@ -1,4 +1,45 @@
 CREATE TABLE IF NOT EXISTS USER_PROFILE (
     USER_ID INTEGER PRIMARY KEY,
     NAME TEXT
-)
\ No newline at end of file
+);
+CREATE UNIQUE INDEX IF NOT EXISTS USER_PROFILE_NAME ON USER_PROFILE (NAME);
+
+-- BODYPARTS and ANGLES are JSON arrays, i.e. bodypart1.. and angle1..
+-- of exercises.json in order. Removed exercises are only marked
+-- DELETED, so the scores and routine entries that use them are kept.
+CREATE TABLE IF NOT EXISTS EXERCISE (
+    EXERCISE_ID INTEGER PRIMARY KEY,
+    NAME TEXT NOT NULL UNIQUE,
+    REPS INTEGER NOT NULL,
+    SETS INTEGER NOT NULL,
+    DURATION INTEGER NOT NULL,
+    DESCRIPTION TEXT NOT NULL DEFAULT '',
+    IMAGE_PATH TEXT NOT NULL DEFAULT '',
+    BODYPARTS TEXT NOT NULL DEFAULT '[]',
+    ANGLES TEXT NOT NULL DEFAULT '[]',
+    DELETED INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS ROUTINE (
+    ROUTINE_ID INTEGER PRIMARY KEY,
+    NAME TEXT NOT NULL UNIQUE,
+    DESCRIPTION TEXT NOT NULL DEFAULT ''
+);
+
+CREATE TABLE IF NOT EXISTS ROUTINE_EXERCISE (
+    ROUTINE_ID INTEGER NOT NULL REFERENCES ROUTINE (ROUTINE_ID) ON DELETE CASCADE,
+    POSITION INTEGER NOT NULL,
+    EXERCISE_ID INTEGER NOT NULL REFERENCES EXERCISE (EXERCISE_ID) ON DELETE RESTRICT,
+    SETS INTEGER NOT NULL,
+    REPS INTEGER NOT NULL,
+    PRIMARY KEY (ROUTINE_ID, POSITION)
+);
+
+-- One row per finished set, in the order the sets were done.
+CREATE TABLE IF NOT EXISTS SCORE_HISTORY (
+    SCORE_ID INTEGER PRIMARY KEY,
+    USER_ID INTEGER NOT NULL REFERENCES USER_PROFILE (USER_ID) ON DELETE RESTRICT,
+    EXERCISE_ID INTEGER NOT NULL REFERENCES EXERCISE (EXERCISE_ID) ON DELETE RESTRICT,
+    SCORE REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS SCORE_HISTORY_USER_EXERCISE ON SCORE_HISTORY (USER_ID, EXERCISE_ID, SCORE_ID);
\ No newline at end of file